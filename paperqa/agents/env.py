@@ -44,10 +44,7 @@ def settings_to_tools(
     for tool_type in (
         (PaperSearch, GatherEvidence, GenerateAnswer)
         if settings.agent.tool_names is None
-        else [
-            AVAILABLE_TOOL_NAME_TO_CLASS[name]
-            for name in set(settings.agent.tool_names)
-        ]
+        else [AVAILABLE_TOOL_NAME_TO_CLASS[name] for name in settings.agent.tool_names]
     ):
         if issubclass(tool_type, PaperSearch):
             tool = Tool.from_function(
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import logging
 import re
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from typing import cast
 
 from rich.table import Table
@@ -14,6 +16,25 @@ from .models import AnswerResponse
 
 logger = logging.getLogger(__name__)
 
+# Repeated questions are common in agent workflows, so cache parsed search
+# queries to avoid paying an LLM round-trip for a question we've already seen.
+# Keyed on all arguments that influence the LLM call, evicted in LRU order.
+_SEARCH_QUERY_CACHE_MAX_SIZE = 128
+_search_query_cache: OrderedDict[tuple, list[str]] = OrderedDict()
+
+# strips leading "2.", "3.", etc. -- https://regex101.com/r/W2f7F1/1
+_LEAD_ENUMERATION = re.compile(r"^\d+\.\s*")
+# deletes quotes/brackets in one C-level pass via str.translate
+_QUOTE_TABLE = str.maketrans("", "", '"[]')
+
+
+@lru_cache(maxsize=32)
+def _search_query_model(llm: str, temperature: float) -> LiteLLMModel:
+    """Get a search query model, reusing instances since construction validates model lists."""
+    model = LiteLLMModel(name=llm)
+    model.config["model_list"][0]["litellm_params"].update({"temperature": temperature})
+    return model
+
 
 def get_year(ts: datetime | None = None) -> str:
     """Get the year from the input datetime, otherwise using the current datetime."""
@@ -29,6 +50,11 @@ async def litellm_get_search_query(
     llm: str = "gpt-4o-mini",
     temperature: float = 1.0,
 ) -> list[str]:
+    cache_key = (question, count, template, llm, temperature)
+    if (cached_queries := _search_query_cache.get(cache_key)) is not None:
+        _search_query_cache.move_to_end(cache_key)
+        return list(cached_queries)
+
     search_prompt = ""
     if isinstance(template, str) and all(
         x in template for x in ("{count}", "{question}", "{date}")
@@ -51,19 +77,22 @@ async def litellm_get_search_query(
             f" is optional. The current year is {get_year()}."
         )
 
-    model = LiteLLMModel(name=llm)
-    model.config["model_list"][0]["litellm_params"].update({"temperature": temperature})
+    model = _search_query_model(llm, temperature)
     result = await model.run_prompt(
         prompt=search_prompt,
         data={"question": question, "count": count},
         skip_system=True,
     )
-    search_query = result.text
-    queries = [s for s in search_query.split("\n") if len(s) > 3]  # noqa: PLR2004
-    # remove "2.", "3.", etc. -- https://regex101.com/r/W2f7F1/1
-    queries = [re.sub(r"^\d+\.\s*", "", q) for q in queries]
-    # remove quotes
-    return [re.sub(r'["\[\]]', "", q) for q in queries]
+    queries = [
+        q
+        for s in result.text.split("\n")
+        if len(q := _LEAD_ENUMERATION.sub("", s).translate(_QUOTE_TABLE))
+        > 3  # noqa: PLR2004
+    ]
+    _search_query_cache[cache_key] = queries
+    if len(_search_query_cache) > _SEARCH_QUERY_CACHE_MAX_SIZE:
+        _search_query_cache.popitem(last=False)
+    return list(queries)
 
 
 def table_formatter(
@@ -157,12 +157,12 @@ async def run_fake_agent(
         await on_env_reset_callback(env.state)
 
     question = env.state.answer.question
-    search_tool = next(filter(lambda x: x.info.name == PaperSearch.TOOL_FN_NAME, tools))
+    search_tool = next(t for t in tools if t.info.name == PaperSearch.TOOL_FN_NAME)
     gather_evidence_tool = next(
-        filter(lambda x: x.info.name == GatherEvidence.TOOL_FN_NAME, tools)
+        t for t in tools if t.info.name == GatherEvidence.TOOL_FN_NAME
     )
     generate_answer_tool = next(
-        filter(lambda x: x.info.name == GenerateAnswer.TOOL_FN_NAME, tools)
+        t for t in tools if t.info.name == GenerateAnswer.TOOL_FN_NAME
     )
 
     async def step(tool: Tool, **call_kwargs) -> None:
@@ -260,7 +260,7 @@ async def run_aviary_agent(
         )
         status = AgentStatus.TRUNCATED
         generate_answer_tool = next(
-            filter(lambda x: x.info.name == GenerateAnswer.TOOL_FN_NAME, env.tools)
+            t for t in env.tools if t.info.name == GenerateAnswer.TOOL_FN_NAME
         )
         await generate_answer_tool._tool_fn(question=query.query, state=env.state)
     except Exception:
@@ -312,7 +312,7 @@ async def run_ldp_agent(
         )
         status = AgentStatus.TRUNCATED
         generate_answer_tool = next(
-            filter(lambda x: x.info.name == GenerateAnswer.TOOL_FN_NAME, env.tools)
+            t for t in env.tools if t.info.name == GenerateAnswer.TOOL_FN_NAME
         )
         await generate_answer_tool._tool_fn(question=query.query, state=env.state)
     except Exception:
@@ -33,6 +33,17 @@ ALL_CLIENTS: Collection[type[MetadataPostProcessor | MetadataProvider]] = {
 }
 
 
+def default_client_session() -> aiohttp.ClientSession:
+    """Make a session tuned for many small metadata calls to a few hosts.
+
+    Metadata resolution is dominated by TCP+TLS setup, so keep-alive and a
+    DNS cache matter more than raw connection count here.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=64, limit_per_host=32, ttl_dns_cache=300)
+    )
+
+
 class DocMetadataTask(BaseModel):
     """Holder for provider and processor tasks."""
 
@@ -131,7 +142,7 @@ class DocMetadataClient:
 
     async def query(self, **kwargs) -> DocDetails | None:
 
-        session = aiohttp.ClientSession() if self._session is None else self._session
+        session = default_client_session() if self._session is None else self._session
 
         query_args = kwargs if "session" in kwargs else kwargs | {"session": session}
 
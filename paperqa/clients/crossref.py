@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-import contextlib
-import copy
+import asyncio
+import hashlib
+import itertools
 import json
 import logging
 import os
+import re
+import sqlite3
+import time
 from collections.abc import Collection
 from datetime import datetime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Literal, overload
 from urllib.parse import quote
 
 import aiohttp
@@ -24,7 +29,7 @@ from paperqa.types import CITATION_FALLBACK_DATA, DocDetails
 from paperqa.utils import (
     bibtex_field_extract,
     create_bibtex_key,
-    remove_substrings,
+    gather_with_concurrency,
     strings_similarity,
     union_collections_to_ordered_list,
 )
@@ -103,7 +108,83 @@ CROSSREF_CONTENT_TYPE_TO_BIBTEX_MAPPING: dict[str, str] = {
 
 _ISSUED_WARNINGS = [False, False]  # 0 is API key, 1 is email
 
+# extracts the citation key from "@article{key, ..." in one scan
+_BIBTEX_KEY_PATTERN = re.compile(r"@\w+\{([^,]+),")
+# characters forbidden in bibtex keys, stripped via str.translate
+_FORBIDDEN_KEY_CHARACTERS_TABLE = str.maketrans("", "", "_ -/")
+_AUTHOR_SEPARATOR_PATTERN = re.compile(r" and |,")
+
+# Opt-in on-disk cache for Crossref responses, enabled by setting the
+# PAPERQA_CROSSREF_CACHE environment variable. Repeat DOI/title lookups then
+# resolve from SQLite in milliseconds instead of paying a network round-trip.
+CROSSREF_CACHE_TTL_SECONDS = 60 * 60 * 24 * 30  # 30 days
+_CROSSREF_CACHE_SCHEMA_VERSION = "1"  # Bump to invalidate cached payloads
+_crossref_cache_conn: sqlite3.Connection | None = None
+
+
+def _crossref_cache() -> sqlite3.Connection | None:
+    """Lazily open the opt-in Crossref response cache, or None if disabled."""
+    global _crossref_cache_conn  # noqa: PLW0603
+    if not os.environ.get("PAPERQA_CROSSREF_CACHE"):
+        return None
+    if _crossref_cache_conn is None:
+        from paperqa.utils import pqa_directory
+
+        conn = sqlite3.connect(
+            pqa_directory("caches") / "crossref.db", check_same_thread=False
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache"
+            " (key TEXT PRIMARY KEY, value TEXT, created REAL)"
+        )
+        conn.commit()
+        _crossref_cache_conn = conn
+    return _crossref_cache_conn
+
+
+def _crossref_cache_key(**params) -> str:
+    params["schema_version"] = _CROSSREF_CACHE_SCHEMA_VERSION
+    serialized = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.blake2b(serialized.encode()).hexdigest()
+
+
+async def _crossref_cache_get(key: str) -> str | None:
+    conn = _crossref_cache()
+    if conn is None:
+        return None
+
+    def _get() -> str | None:
+        row = conn.execute(
+            "SELECT value, created FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if time.time() - created > CROSSREF_CACHE_TTL_SECONDS:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        return value
+
+    # run in a thread to avoid blocking the event loop on SQLite I/O
+    return await asyncio.to_thread(_get)
+
+
+async def _crossref_cache_set(key: str, value: str) -> None:
+    conn = _crossref_cache()
+    if conn is None:
+        return
+
+    def _set() -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (key, value, time.time())
+        )
+        conn.commit()
+
+    await asyncio.to_thread(_set)
 
+
+@lru_cache(maxsize=1)
 def crossref_headers() -> dict[str, str]:
     """Crossref API key if available, otherwise nothing."""
     try:
@@ -132,6 +213,23 @@ def get_crossref_mailto() -> str:
         return "example@papercrow.ai"
 
 
+# overloads let callers using the default raising behavior unpack the
+# tuple without a spurious "None is not iterable" from type checkers
+@overload
+async def doi_to_bibtex(
+    doi: str,
+    session: aiohttp.ClientSession,
+    missing_replacements: dict[str, str] | None = ...,
+    raise_on_missing: Literal[True] = ...,
+) -> tuple[str, str]: ...
+@overload
+async def doi_to_bibtex(
+    doi: str,
+    session: aiohttp.ClientSession,
+    missing_replacements: dict[str, str] | None = ...,
+    *,
+    raise_on_missing: Literal[False],
+) -> tuple[str, str] | None: ...
 @retry(
     retry=retry_if_exception(make_flaky_ssl_error_predicate(CROSSREF_HOST)),
     before_sleep=before_sleep_log(logger, logging.WARNING),
@@ -141,46 +239,47 @@ async def doi_to_bibtex(
     doi: str,
     session: aiohttp.ClientSession,
     missing_replacements: dict[str, str] | None = None,
-) -> str:
-    """Get a bibtex entry from a DOI via Crossref, replacing the key if possible.
+    raise_on_missing: bool = True,
+) -> tuple[str, str] | None:
+    """Get a (bibtex entry, citation key) from a DOI via Crossref, replacing the key if possible.
 
     `missing_replacements` can optionally be used to fill missing fields in the bibtex key.
         these fields are NOT replaced or inserted into the bibtex string otherwise.
+    `raise_on_missing` controls whether an unresolvable DOI raises DOINotFoundError
+        or just returns None, for callers that treat a miss as routine.
 
     """
     if missing_replacements is None:
         missing_replacements = {}
-    FORBIDDEN_KEY_CHARACTERS = {"_", " ", "-", "/"}
-    # get DOI via crossref
-    async with session.get(
-        f"https://api.crossref.org/works/{quote(doi, safe='')}/transform/application/x-bibtex",
-        headers=crossref_headers(),
-    ) as r:
-        if not r.ok:
-            raise DOINotFoundError(
-                f"Per HTTP status code {r.status}, could not resolve DOI {doi}."
-            )
-        data = await r.text()
+    # get DOI via crossref, preferring the on-disk cache when enabled
+    cache_key = _crossref_cache_key(fn="doi_to_bibtex", doi=doi)
+    data = await _crossref_cache_get(cache_key)
+    if data is None:
+        async with session.get(
+            f"https://api.crossref.org/works/{quote(doi, safe='')}/transform/application/x-bibtex",
+            headers=crossref_headers(),
+        ) as r:
+            if not r.ok:
+                if not raise_on_missing:
+                    return None
+                raise DOINotFoundError(
+                    f"Per HTTP status code {r.status}, could not resolve DOI {doi}."
+                )
+            data = await r.text()
+        await _crossref_cache_set(cache_key, data)
     # must make new key
-    key = data.split("{")[1].split(",")[0]
-    new_key = remove_substrings(key, FORBIDDEN_KEY_CHARACTERS)
-    substrings_to_remove_per_field = {"author": [" and ", ","]}
-    fragments = [
-        remove_substrings(
-            bibtex_field_extract(
-                data, field, missing_replacements=missing_replacements
-            ),
-            substrings_to_remove_per_field.get(field, []),
-        )
+    key = _BIBTEX_KEY_PATTERN.search(data).group(1)  # type: ignore[union-attr]
+    new_key = key.translate(_FORBIDDEN_KEY_CHARACTERS_TABLE)
+    author, year, title = (
+        bibtex_field_extract(data, field, missing_replacements=missing_replacements)
         for field in ("author", "year", "title")
-    ]
+    )
+    author = _AUTHOR_SEPARATOR_PATTERN.sub("", author)
     # replace the key if all the fragments are present
-    if all(fragments):
-        new_key = create_bibtex_key(
-            author=fragments[0].split(), year=fragments[1], title=fragments[2]
-        )
+    if author and year and title:
+        new_key = create_bibtex_key(author=author.split(), year=year, title=title)
     # we use the count parameter below to ensure only the 1st entry is replaced
-    return data.replace(key, new_key, 1)
+    return data.replace(key, new_key, 1), new_key
 
 
 async def parse_crossref_to_doc_details(
@@ -190,76 +289,91 @@ async def parse_crossref_to_doc_details(
 ) -> DocDetails:
 
     bibtex_source = "self_generated"
-    bibtex = None
-
-    with contextlib.suppress(DOINotFoundError):
+    bibtex = bibtex_key = None
+
+    # hoist the repeated message walks into locals, so each nested
+    # key is looked up (and each default allocated) at most once
+    title_list = message.get("title")
+    title = title_list[0] if title_list else None
+    date_parts = (message.get("published") or {}).get("date-parts")
+    first_date = date_parts[0] if date_parts else None
+    container_list = message.get("container-title")
+    issn_list = message.get("ISSN")
+
+    # TODO: we keep this for robustness, but likely not needed anymore,
+    # since we now create the bibtex from scratch
+    if query_bibtex:
         # get the title from the message, if it exists
         # rare circumstance, but bibtex may not have a title
-        fallback_data = copy.copy(CITATION_FALLBACK_DATA)
-        if title := (
-            None if not message.get("title") else message.get("title", [None])[0]
-        ):
+        fallback_data = dict(CITATION_FALLBACK_DATA)
+        if title:
             fallback_data["title"] = title
 
-        # TODO: we keep this for robustness, but likely not needed anymore,
-        # since we now create the bibtex from scratch
-        if query_bibtex:
-            bibtex = await doi_to_bibtex(
-                message["DOI"], session, missing_replacements=fallback_data  # type: ignore[arg-type]
+        # a miss here is routine, so branch on None rather than
+        # paying for a raised-and-suppressed DOINotFoundError
+        if (
+            bibtex_result := await doi_to_bibtex(  # type: ignore[call-overload]
+                message["DOI"],
+                session,
+                missing_replacements=fallback_data,
+                raise_on_missing=False,
             )
+        ) is not None:
+            bibtex, bibtex_key = bibtex_result
             # track the origin of the bibtex entry for debugging
             bibtex_source = "crossref"
 
     authors = [
-        f"{author.get('given', '')} {author.get('family', '')}".strip()
-        for author in message.get("author", [])
+        " ".join(p for p in (author.get("given"), author.get("family")) if p)
+        for author in message.get("author") or ()
     ]
 
     publication_date = None
-    if "published" in message and "date-parts" in message["published"]:
-        date_parts = message["published"]["date-parts"][0]
-        if len(date_parts) >= 3:  # noqa: PLR2004
-            publication_date = datetime(date_parts[0], date_parts[1], date_parts[2])
-        elif len(date_parts) == 2:  # noqa: PLR2004
-            publication_date = datetime(date_parts[0], date_parts[1], 1)
-        elif len(date_parts) == 1:
-            publication_date = datetime(date_parts[0], 1, 1)
+    if first_date:
+        if len(first_date) >= 3:  # noqa: PLR2004
+            publication_date = datetime(first_date[0], first_date[1], first_date[2])
+        elif len(first_date) == 2:  # noqa: PLR2004
+            publication_date = datetime(first_date[0], first_date[1], 1)
+        elif len(first_date) == 1:
+            publication_date = datetime(first_date[0], 1, 1)
 
     doc_details = DocDetails(  # type: ignore[call-arg]
-        key=None if not bibtex else bibtex.split("{")[1].split(",")[0],
+        key=bibtex_key,
+        # "other" is in the mapping (-> "article"), so the "misc" default
+        # only kicks in for genuinely unknown types
         bibtex_type=CROSSREF_CONTENT_TYPE_TO_BIBTEX_MAPPING.get(
-            message.get("type", "other"), "misc"
+            message.get("type") or "other", "misc"
         ),
         bibtex=bibtex,
         authors=authors,
         publication_date=publication_date,
-        year=message.get("published", {}).get("date-parts", [[None]])[0][0],
+        year=first_date[0] if first_date else None,
         volume=message.get("volume"),
         issue=message.get("issue"),
         publisher=message.get("publisher"),
-        issn=message.get("ISSN", [None])[0],
+        issn=issn_list[0] if issn_list else None,
         pages=message.get("page"),
-        journal=(
-            None
-            if not message.get("container-title")
-            else message["container-title"][0]
-        ),
+        journal=container_list[0] if container_list else None,
         url=message.get("URL"),
-        title=None if not message.get("title") else message.get("title", [None])[0],
+        title=title,
         citation_count=message.get("is-referenced-by-count"),
         doi=message.get("DOI"),
         other={},  # Initialize empty dict for other fields
     )
 
-    # Add any additional fields to the 'other' dict
-    for key, value in (
-        message | {"client_source": ["crossref"], "bibtex_source": [bibtex_source]}
-    ).items():
-        if key not in doc_details.model_fields:
-            if key in doc_details.other:
-                doc_details.other[key] = [doc_details.other[key], value]
+    # Add any additional fields to the 'other' dict, chaining the two sources
+    # rather than merging them into a throwaway copy of the message
+    model_fields = doc_details.model_fields
+    other = doc_details.other
+    for key, value in itertools.chain(
+        message.items(),
+        (("client_source", ["crossref"]), ("bibtex_source", [bibtex_source])),
+    ):
+        if key not in model_fields:
+            if key in other:
+                other[key] = [other[key], value]
             else:
-                doc_details.other[key] = value
+                other[key] = value
 
     return doc_details
 
@@ -322,24 +436,36 @@ async def get_doc_details_from_crossref(  # noqa: PLR0912
             }
         )
 
-    async with session.get(
-        url,
-        params=params,
-        headers=crossref_headers(),
-        timeout=aiohttp.ClientTimeout(CROSSREF_API_REQUEST_TIMEOUT),
-    ) as response:
-        try:
-            response.raise_for_status()
-        except aiohttp.ClientResponseError as exc:
-            raise DOINotFoundError(f"Could not find paper given {inputs_msg}.") from exc
-        try:
-            response_data = await response.json()
-        except json.JSONDecodeError as exc:
-            # JSONDecodeError: Crossref didn't answer with JSON, perhaps HTML
-            raise DOINotFoundError(  # Use DOINotFoundError so we fall back to Google Scholar
-                f"Crossref API did not return JSON for {inputs_msg}, instead it"
-                f" responded with text: {await response.text()}"
-            ) from exc
+    cache_key = _crossref_cache_key(
+        fn="get_doc_details_from_crossref", url=url, params=params
+    )
+    if (cached_response := await _crossref_cache_get(cache_key)) is not None:
+        response_data = json.loads(cached_response)
+    else:
+        async with session.get(
+            url,
+            params=params,
+            headers=crossref_headers(),
+            timeout=aiohttp.ClientTimeout(CROSSREF_API_REQUEST_TIMEOUT),
+        ) as response:
+            try:
+                response.raise_for_status()
+            except aiohttp.ClientResponseError as exc:
+                raise DOINotFoundError(
+                    f"Could not find paper given {inputs_msg}."
+                ) from exc
+            # parse the raw bytes ourselves, skipping aiohttp's content-type
+            # check and intermediate str decode (json.loads accepts bytes)
+            raw_response = await response.read()
+            try:
+                response_data = json.loads(raw_response)
+            except json.JSONDecodeError as exc:
+                # JSONDecodeError: Crossref didn't answer with JSON, perhaps HTML
+                raise DOINotFoundError(  # Use DOINotFoundError so we fall back to Google Scholar
+                    f"Crossref API did not return JSON for {inputs_msg}, instead it"
+                    f" responded with text: {raw_response.decode(errors='replace')}"
+                ) from exc
+        await _crossref_cache_set(cache_key, json.dumps(response_data))
     if response_data["status"] == "failed":
         raise DOINotFoundError(
             f"Crossref API returned a failed status for {inputs_msg}."
@@ -348,12 +474,20 @@ async def get_doc_details_from_crossref(  # noqa: PLR0912
     # restructure data if it comes back as a list result
     # it'll also be a list if we searched by title and it's empty
     if "items" in message:
-        try:
-            message = message["items"][0]
-        except IndexError as e:
+        items = message["items"]
+        if not items:
             raise DOINotFoundError(
                 f"Crossref API did not return any items for {inputs_msg}."
-            ) from e
+            )
+        # should multiple items come back, keep the best title match
+        # rather than blindly trusting Crossref's first-ranked hit
+        if title and len(items) > 1:
+            message = max(
+                items,
+                key=lambda m: strings_similarity((m.get("title") or [""])[0], title),
+            )
+        else:
+            message = items[0]
     # since score is not consistent between queries, we need to rely on our own criteria
     # title similarity must be > title_similarity_threshold
     if (
@@ -408,9 +542,137 @@ async def download_retracted_dataset(
             raise RuntimeError("Retraction data is empty")
 
 
+# Opt-in coalescing of concurrent DOI lookups into a single Crossref
+# filter=doi: request, enabled via the PAPERQA_CROSSREF_BATCH environment
+# variable. N concurrent DOI resolutions then cost one round-trip, not N.
+CROSSREF_BATCH_WINDOW_SECONDS = 0.02
+# Keeps the filter= query string comfortably under URL length limits (HTTP 414)
+CROSSREF_MAX_BATCH_SIZE = 40
+# Concurrency cap for per-DOI fallback when a batched request fails
+CROSSREF_FALLBACK_CONCURRENCY = 16
+
+
+class _DOIBatcher:
+    """Coalesce concurrent DOI queries issued within a short window into one request."""
+
+    def __init__(self) -> None:
+        self._pending: list[tuple[DOIQuery, asyncio.Future[DocDetails | None]]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    async def query(self, query: DOIQuery) -> DocDetails | None:
+        future: asyncio.Future[DocDetails | None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending.append((query, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(CROSSREF_BATCH_WINDOW_SECONDS)
+        # Queries can arrive while a flush is in flight, after we swapped
+        # self._pending out but before this task is marked done -- keep
+        # draining until empty so no caller is left awaiting forever
+        while self._pending:
+            pending, self._pending = self._pending, []
+            for i in range(0, len(pending), CROSSREF_MAX_BATCH_SIZE):
+                await self._flush(pending[i : i + CROSSREF_MAX_BATCH_SIZE])
+
+    async def _flush(
+        self, batch: list[tuple[DOIQuery, asyncio.Future[DocDetails | None]]]
+    ) -> None:
+        session = batch[0][0].session
+        try:
+            async with session.get(
+                f"{CROSSREF_BASE_URL}/works",
+                params={
+                    "mailto": get_crossref_mailto(),
+                    "filter": ",".join(f"doi:{query.doi}" for query, _ in batch),
+                    "rows": str(len(batch)),
+                },
+                headers=crossref_headers(),
+                timeout=aiohttp.ClientTimeout(CROSSREF_API_REQUEST_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+                response_data = await response.json()
+        except (aiohttp.ClientError, TimeoutError):
+            # e.g. HTTP 414 if the URL grew too long -- fall back to per-DOI
+            await self._flush_per_doi(batch)
+            return
+        if response_data.get("status") == "failed":
+            # the filter= endpoint rejected the whole batch, so retry per-DOI
+            await self._flush_per_doi(batch)
+            return
+        try:
+            messages_by_doi = {
+                message["DOI"].lower(): message
+                for message in response_data["message"]["items"]
+            }
+        except Exception as exc:
+            # this runs in a detached task nobody awaits, so an unexpected
+            # payload shape must be propagated onto the waiters or they hang
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for query, future in batch:
+            if future.done():
+                continue
+            if (message := messages_by_doi.get(query.doi.lower())) is None:
+                future.set_exception(
+                    DOINotFoundError(f"DOI ({query.doi}) not found in Crossref")
+                )
+            else:
+                try:
+                    future.set_result(
+                        await parse_crossref_to_doc_details(message, query.session)
+                    )
+                except Exception as exc:
+                    future.set_exception(exc)
+
+    @staticmethod
+    async def _flush_per_doi(
+        batch: list[tuple[DOIQuery, asyncio.Future[DocDetails | None]]],
+    ) -> None:
+        """Resolve each query individually when the batched request fails."""
+
+        async def resolve(
+            query: DOIQuery, future: asyncio.Future[DocDetails | None]
+        ) -> None:
+            if future.done():
+                return
+            try:
+                future.set_result(
+                    await get_doc_details_from_crossref(
+                        doi=query.doi, session=query.session, fields=query.fields
+                    )
+                )
+            except Exception as exc:
+                future.set_exception(exc)
+
+        # pipeline the fallback lookups instead of paying N serial round-trips,
+        # capped to stay within Crossref's polite-pool rate limits
+        await gather_with_concurrency(
+            CROSSREF_FALLBACK_CONCURRENCY, list(itertools.starmap(resolve, batch))
+        )
+
+
+# one batcher per event loop, since futures cannot cross loops
+_doi_batchers: dict[asyncio.AbstractEventLoop, _DOIBatcher] = {}
+
+
+def _get_doi_batcher() -> _DOIBatcher:
+    loop = asyncio.get_running_loop()
+    if (batcher := _doi_batchers.get(loop)) is None:
+        batcher = _doi_batchers[loop] = _DOIBatcher()
+    return batcher
+
+
 class CrossrefProvider(DOIOrTitleBasedProvider):
     async def _query(self, query: TitleAuthorQuery | DOIQuery) -> DocDetails | None:
         if isinstance(query, DOIQuery):
+            if os.environ.get("PAPERQA_CROSSREF_BATCH"):
+                return await _get_doi_batcher().query(query)
             return await get_doc_details_from_crossref(
                 doi=query.doi, session=query.session, fields=query.fields
             )
@@ -164,16 +164,18 @@ async def parse_s2_to_doc_details(
         raise DOINotFoundError(f"Could not find DOI for {paper_data}.")
 
     # Should we give preference to auto-generation?
+    bibtex_key = None
     if not (
         bibtex := clean_upbibtex(paper_data.get("citationStyles", {}).get("bibtex", ""))
     ):
         try:
-            bibtex = await doi_to_bibtex(doi, session)
+            bibtex, bibtex_key = await doi_to_bibtex(doi, session)
             bibtex_source = "crossref"
         except DOINotFoundError:
             bibtex = None
     else:
         bibtex_source = "semantic_scholar"
+        bibtex_key = bibtex.split("{")[1].split(",")[0]
 
     publication_date = None
     if paper_data.get("publicationDate"):
@@ -182,7 +184,7 @@ async def parse_s2_to_doc_details(
     journal_data = paper_data.get("journal") or {}
 
     doc_details = DocDetails(  # type: ignore[call-arg]
-        key=None if not bibtex else bibtex.split("{")[1].split(",")[0],
+        key=bibtex_key if bibtex else None,
         bibtex_type="article",  # s2 should be basically all articles
         bibtex=bibtex,
         authors=[author["name"] for author in paper_data.get("authors", [])],
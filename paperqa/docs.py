@@ -1,22 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
+import pickle
 import re
+import shutil
 import tempfile
 from collections.abc import Callable
 from datetime import datetime
 from functools import partial
-from io import BytesIO
+from io import StringIO
+from operator import attrgetter
 from pathlib import Path
 from typing import Any, BinaryIO, cast
 from uuid import UUID, uuid4
 
+import aiohttp
+import numpy as np
 from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PrivateAttr,
     ValidationInfo,
     field_validator,
 )
@@ -29,6 +36,7 @@ from paperqa.llms import (
     NumpyVectorStore,
     PromptRunner,
     VectorStore,
+    cosine_similarity,
 )
 from paperqa.paths import PAPERQA_DIR
 from paperqa.readers import read_doc
@@ -54,6 +62,61 @@ from paperqa.utils import (
 
 logger = logging.getLogger(__name__)
 
+# First capitalized word and four-digit year, for docnames guessed from citations
+_CITATION_AUTHOR_PATTERN = re.compile(r"([A-Z][a-z]+)")
+_CITATION_YEAR_PATTERN = re.compile(r"(\d{4})")
+_EXTRA_BACKGROUND_PATTERN = re.compile(r"\([Ee]xtra [Bb]ackground [Ii]nformation\)")
+
+# How long to wait for other concurrent embedding requests to show up before
+# sending a batch, trading a little latency for fewer network round-trips
+EMBEDDING_BATCH_WINDOW_SECONDS = 0.025
+
+
+class _EmbeddingBatcher:
+    """Coalesce concurrent embed_documents calls into one request per model."""
+
+    def __init__(self, embedding_model: EmbeddingModel) -> None:
+        self.embedding_model = embedding_model
+        self._pending: list[tuple[list[str], asyncio.Future[list[list[float]]]]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    def __reduce__(self) -> tuple:
+        # Drop in-flight state (futures, tasks) when pickling the owning Docs
+        return type(self), (self.embedding_model,)
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        future: asyncio.Future[list[list[float]]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending.append((texts, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(EMBEDDING_BATCH_WINDOW_SECONDS)
+        # Drain repeatedly in case submissions race with an in-flight flush
+        while self._pending:
+            pending, self._pending = self._pending, []
+            await self._flush(pending)
+
+    async def _flush(
+        self, batch: list[tuple[list[str], asyncio.Future[list[list[float]]]]]
+    ) -> None:
+        flattened = [text for texts, _ in batch for text in texts]
+        try:
+            embeddings = await self.embedding_model.embed_documents(flattened)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        offset = 0
+        for texts, future in batch:
+            if not future.done():
+                future.set_result(list(embeddings[offset : offset + len(texts)]))
+            offset += len(texts)
+
 
 # this is just to reduce None checks/type checks
 async def empty_callback(result: LLMResult) -> None:
@@ -80,6 +143,16 @@ class Docs(BaseModel):
     )
     deleted_dockeys: set[DocKey] = Field(default_factory=set)
 
+    _embedding_batchers: dict[str, _EmbeddingBatcher] = PrivateAttr(
+        default_factory=dict
+    )
+    # Prior (question embedding, Answer) pairs, cleared whenever docs change
+    _answer_cache: list[tuple[list[float], Answer]] = PrivateAttr(default_factory=list)
+    _texts_by_dockey: dict[DocKey, list[Text]] = PrivateAttr(default_factory=dict)
+    # Next suffix index to try per proposed docname, so bulk ingests of
+    # same-author-same-year papers don't rescan taken suffixes quadratically
+    _docname_counters: dict[str, int] = PrivateAttr(default_factory=dict)
+
     @field_validator("index_path")
     @classmethod
     def handle_default(cls, value: Path | None, info: ValidationInfo) -> Path | None:
@@ -91,15 +164,94 @@ class Docs(BaseModel):
         self.texts = []
         self.docs = {}
         self.docnames = set()
+        self._texts_by_dockey.clear()
+        self._docname_counters.clear()
+
+    def _texts_grouped_by_dockey(self) -> dict[DocKey, list[Text]]:
+        """Get texts grouped per dockey, rebuilding lazily (e.g. after unpickling)."""
+        if not self._texts_by_dockey and self.texts:
+            for t in self.texts:
+                self._texts_by_dockey.setdefault(t.doc.dockey, []).append(t)
+        return self._texts_by_dockey
 
     def _get_unique_name(self, docname: str) -> str:
         """Create a unique name given proposed name."""
-        suffix = ""
-        while docname + suffix in self.docnames:
+        n = self._docname_counters.get(docname, 0)
+        candidate = docname if n == 0 else docname + chr(ord("a") + n - 1)
+        # membership stays the final authority, e.g. for stale counters
+        while candidate in self.docnames:
             # move suffix to next letter
-            suffix = "a" if suffix == "" else chr(ord(suffix) + 1)
-        docname += suffix
-        return docname
+            n += 1
+            candidate = docname + chr(ord("a") + n - 1)
+        self._docname_counters[docname] = n + 1
+        return candidate
+
+    def save_index(self, index_path: Path | None = None) -> None:
+        """Persist this collection so another process can load it without re-embedding.
+
+        Writes an mmap-friendly embeddings.npy next to a pickle of everything
+        else (with the per-text embedding lists stripped out).
+        """
+        index_path = index_path or self.index_path
+        if index_path is None:
+            raise ValueError("Cannot save index without an index path.")
+        index_path = Path(index_path)
+        embeddings = [t.embedding for t in self.texts]
+        if any(e is None for e in embeddings):
+            raise ValueError("Cannot save index until all texts are embedded.")
+        index_path.mkdir(parents=True, exist_ok=True)
+        # keep the empty case 2-D so load_index can still treat it as a matrix
+        matrix = np.array(embeddings) if embeddings else np.empty((0, 0))
+        np.save(index_path / "embeddings.npy", matrix)
+        stripped = self.model_copy(deep=True)
+        for t in stripped.texts:
+            t.embedding = None
+        # empty the copied index (keeping its class and settings), since
+        # load_index rebuilds it from the texts and matrix
+        stripped.texts_index.clear()
+        stripped.texts_index.texts_hashes.clear()
+        with (index_path / "docs.pkl").open("wb") as f:
+            pickle.dump(stripped, f)
+
+    @classmethod
+    def load_index(cls, index_path: Path) -> Docs:
+        """Load a collection written by save_index, memory-mapping its embeddings."""
+        index_path = Path(index_path)
+        with (index_path / "docs.pkl").open("rb") as f:
+            docs = pickle.load(f)  # noqa: S301
+        matrix = np.load(index_path / "embeddings.npy", mmap_mode="r")
+        for t, row in zip(docs.texts, matrix, strict=True):
+            t.embedding = row  # zero-copy views into the shared mmap
+        if isinstance(docs.texts_index, NumpyVectorStore):
+            docs.texts_index.restore_texts_and_matrix(docs.texts, matrix)
+        else:
+            docs.texts_index.add_texts_and_embeddings(docs.texts)
+        return docs
+
+    def _get_cached_answer(
+        self, question_embedding: list[float], threshold: float
+    ) -> Answer | None:
+        """Find a prior answer whose question is similar enough to reuse."""
+        if not self._answer_cache:
+            return None
+        scores = cosine_similarity(
+            np.array([question_embedding]),
+            np.array([embedding for embedding, _ in self._answer_cache]),
+        )[0]
+        best = int(scores.argmax())
+        if scores[best] < threshold:
+            return None
+        return self._answer_cache[best][1].model_copy(deep=True, update={"id": uuid4()})
+
+    def _get_embedding_batcher(
+        self, embedding_model: EmbeddingModel
+    ) -> _EmbeddingBatcher:
+        """Get the batcher coalescing concurrent embeddings for this model."""
+        batcher = self._embedding_batchers.get(embedding_model.name)
+        if batcher is None or batcher.embedding_model is not embedding_model:
+            batcher = _EmbeddingBatcher(embedding_model)
+            self._embedding_batchers[embedding_model.name] = batcher
+        return batcher
 
     def add_file(
         self,
@@ -146,7 +298,8 @@ class Docs(BaseModel):
             suffix = ".html"
 
         with tempfile.NamedTemporaryFile(suffix=suffix) as f:
-            f.write(file.read())
+            # stream in 1-MiB chunks so large PDFs aren't held in memory twice
+            shutil.copyfileobj(file, f, length=2**20)
             f.seek(0)
             return await self.aadd(
                 Path(f.name),
@@ -195,20 +348,22 @@ class Docs(BaseModel):
         embedding_model: EmbeddingModel | None = None,
     ) -> str | None:
         """Add a document to the collection."""
-        import urllib.request
-
-        with urllib.request.urlopen(url) as f:  # noqa: ASYNC210, S310
-            # need to wrap to enable seek
-            file = BytesIO(f.read())
-            return await self.aadd_file(
-                file,
-                citation=citation,
-                docname=docname,
-                dockey=dockey,
-                settings=settings,
-                llm_model=llm_model,
-                embedding_model=embedding_model,
-            )
+        async with aiohttp.ClientSession() as session, session.get(url) as response:
+            response.raise_for_status()
+            # need a seekable copy -- spooled so small bodies stay in memory
+            with tempfile.SpooledTemporaryFile(max_size=2**20) as file:
+                async for chunk in response.content.iter_chunked(2**20):
+                    file.write(chunk)
+                file.seek(0)
+                return await self.aadd_file(
+                    cast(BinaryIO, file),
+                    citation=citation,
+                    docname=docname,
+                    dockey=dockey,
+                    settings=settings,
+                    llm_model=llm_model,
+                    embedding_model=embedding_model,
+                )
 
     def add(
         self,
@@ -262,6 +417,38 @@ class Docs(BaseModel):
             dockey = md5sum(path)
         if llm_model is None:
             llm_model = all_settings.get_llm()
+
+        doc: Doc | None = None
+        metadata_client: DocMetadataClient | None = None
+        query_kwargs: dict[str, Any] = {}
+        if doi:
+            query_kwargs["doi"] = doi
+        if authors:
+            query_kwargs["authors"] = authors
+        if title:
+            query_kwargs["title"] = title
+        tried_metadata_first = False
+        if citation is None and (title or doi) and parse_config.use_doc_details:
+            # The metadata providers usually have a formatted citation when the
+            # caller supplies identifiers, so try them before paying for a
+            # citation-inference LLM call
+            tried_metadata_first = True
+            if kwargs.get("metadata_client"):
+                metadata_client = kwargs["metadata_client"]
+            else:
+                metadata_client = DocMetadataClient(
+                    session=kwargs.pop("session", None),
+                    clients=kwargs.pop("clients", DEFAULT_CLIENTS),
+                )
+            if doc_details := await metadata_client.query(**(query_kwargs | kwargs)):
+                # mirror upgrade_doc_to_doc_details' overwrite branch
+                extra_doc = DocDetails(**query_kwargs) if query_kwargs else 0
+                doc = extra_doc + doc_details
+                citation = doc.citation
+                docname = docname or doc.docname
+            # on a miss, fall through to the usual LLM citation inference
+
+        texts: list[Text] | None = None
         if citation is None:
             # Peek first chunk
             texts = read_doc(
@@ -287,7 +474,7 @@ class Docs(BaseModel):
 
         if docname is None:
             # get first name and year from citation
-            match = re.search(r"([A-Z][a-z]+)", citation)
+            match = _CITATION_AUTHOR_PATTERN.search(citation)
             if match is not None:
                 author = match.group(1)
             else:
@@ -298,13 +485,16 @@ class Docs(BaseModel):
                     "(path, citation, key='mykey')"
                 )
             year = ""
-            match = re.search(r"(\d{4})", citation)
+            match = _CITATION_YEAR_PATTERN.search(citation)
             if match is not None:
                 year = match.group(1)
             docname = f"{author}{year}"
         docname = self._get_unique_name(docname)
 
-        doc = Doc(docname=docname, citation=citation, dockey=dockey)
+        if doc is None:
+            doc = Doc(docname=docname, citation=citation, dockey=dockey)
+        else:
+            doc.docname = docname
 
         # try to extract DOI / title from the citation
         if (doi is title is None) and parse_config.use_doc_details:
@@ -344,32 +534,49 @@ class Docs(BaseModel):
         # if "overwrite_fields_from_metadata" is used:
         # will map "docname" to "key", and "dockey" to "doc_id"
         if (title or doi) and parse_config.use_doc_details:
-            if kwargs.get("metadata_client"):
-                metadata_client = kwargs["metadata_client"]
+            if tried_metadata_first:
+                if not isinstance(doc, DocDetails):
+                    # the early lookup missed: keep the inferred fields, but
+                    # still move to DocDetails like upgrade_doc_to_doc_details'
+                    # fallback, without querying the providers a second time
+                    prior_doc = doc.model_dump()
+                    prior_doc["overwrite_fields_from_metadata"] = False
+                    doc = DocDetails(**(prior_doc | query_kwargs))
             else:
-                metadata_client = DocMetadataClient(
-                    session=kwargs.pop("session", None),
-                    clients=kwargs.pop("clients", DEFAULT_CLIENTS),
+                if kwargs.get("metadata_client"):
+                    metadata_client = kwargs["metadata_client"]
+                else:
+                    metadata_client = DocMetadataClient(
+                        session=kwargs.pop("session", None),
+                        clients=kwargs.pop("clients", DEFAULT_CLIENTS),
+                    )
+                # rebuild, since the structured citation prompt may have just
+                # filled in any of these
+                query_kwargs = {}
+                if doi:
+                    query_kwargs["doi"] = doi
+                if authors:
+                    query_kwargs["authors"] = authors
+                if title:
+                    query_kwargs["title"] = title
+                doc = await metadata_client.upgrade_doc_to_doc_details(
+                    doc, **(query_kwargs | kwargs)
                 )
 
-            query_kwargs: dict[str, Any] = {}
-
-            if doi:
-                query_kwargs["doi"] = doi
-            if authors:
-                query_kwargs["authors"] = authors
-            if title:
-                query_kwargs["title"] = title
-            doc = await metadata_client.upgrade_doc_to_doc_details(
-                doc, **(query_kwargs | kwargs)
+        if texts is None:
+            texts = read_doc(
+                path,
+                doc,
+                chunk_chars=parse_config.chunk_size,
+                overlap=parse_config.overlap,
             )
-
-        texts = read_doc(
-            path,
-            doc,
-            chunk_chars=parse_config.chunk_size,
-            overlap=parse_config.overlap,
-        )
+        else:
+            # reuse the chunks parsed for the citation peek (same chunking
+            # settings) rather than re-reading the document: they were built
+            # against the fake doc, whose empty docname prefixed every name
+            for t in texts:
+                t.doc = doc
+                t.name = f"{doc.docname}{t.name}"
         # loose check to see if document was loaded
         if (
             not texts
@@ -431,7 +638,9 @@ class Docs(BaseModel):
         text_embeddings: list[list[float]] | None = None
         if embedding_model:
             text_embeddings = (
-                await embedding_model.embed_documents(texts=[t.text for t in texts])
+                await self._get_embedding_batcher(embedding_model).embed_documents(
+                    [t.text for t in texts]
+                )
                 if texts[0].embedding is None
                 else None
             )
@@ -447,8 +656,10 @@ class Docs(BaseModel):
             doc.docname = new_docname
         # 5. We do not embed here, because we do it lazily
         self.docs[doc.dockey] = doc
+        self._texts_grouped_by_dockey()[doc.dockey] = list(texts)
         self.texts += texts
         self.docnames.add(doc.docname)
+        self._answer_cache.clear()
         return True
 
     def delete(
@@ -469,7 +680,14 @@ class Docs(BaseModel):
             dockey = doc.dockey
         del self.docs[dockey]
         self.deleted_dockeys.add(dockey)
-        self.texts = list(filter(lambda x: x.doc.dockey != dockey, self.texts))
+        # O(chunks in doc) removal: pop the doc's texts and re-concatenate the
+        # rest, instead of running a predicate over every chunk in the corpus
+        grouped = self._texts_grouped_by_dockey()
+        grouped.pop(dockey, None)
+        self.texts = [t for doc_texts in grouped.values() for t in doc_texts]
+        # freed names may be reused, so restart suffix counting
+        self._docname_counters.clear()
+        self._answer_cache.clear()
 
     async def _build_texts_index(self, embedding_model: EmbeddingModel) -> None:
         texts = [t for t in self.texts if t not in self.texts_index]
@@ -496,16 +714,23 @@ class Docs(BaseModel):
         self.texts_index.mmr_lambda = settings.texts_index_mmr_lambda
 
         await self._build_texts_index(embedding_model)
-        _k = k + len(self.deleted_dockeys)
+        # only overshoot k when deleted docs may crowd out results; the doubled
+        # fetch_k is the MMR candidate pool, so that one stays proportional to k
+        overshoot = len(self.deleted_dockeys)
+        _k = k + overshoot
         matches: list[Text] = cast(
             list[Text],
             (
                 await self.texts_index.max_marginal_relevance_search(
-                    query, k=_k, fetch_k=2 * _k, embedding_model=embedding_model
+                    query,
+                    k=_k,
+                    fetch_k=2 * k + overshoot,
+                    embedding_model=embedding_model,
                 )
             )[0],
         )
-        matches = [m for m in matches if m.doc.dockey not in self.deleted_dockeys]
+        if overshoot:
+            matches = [m for m in matches if m.doc.dockey not in self.deleted_dockeys]
         return matches[:k]
 
     def get_evidence(
@@ -669,54 +894,85 @@ class Docs(BaseModel):
             else query
         )
 
+        cache_threshold = answer_config.answer_cache_similarity_threshold
+        question_embedding: list[float] | None = None
+        if cache_threshold is not None:
+            question_embedding = (
+                await embedding_model.embed_documents([answer.question])
+            )[0]
+            cached_answer = self._get_cached_answer(question_embedding, cache_threshold)
+            if cached_answer is not None:
+                return cached_answer
+
         contexts = answer.contexts
 
-        if not contexts:
-            answer = await self.aget_evidence(
-                answer,
-                callbacks=callbacks,
-                settings=settings,
-                embedding_model=embedding_model,
-                summary_llm_model=summary_llm_model,
-            )
-            contexts = answer.contexts
-        pre_str = None
+        pre_task: asyncio.Task[LLMResult] | None = None
         if prompt_config.pre is not None:
+            # pre depends only on the question, so it can run while evidence
+            # is gathered below, hiding one LLM round-trip
             with set_llm_answer_ids(answer.id):
-                pre = await llm_model.run_prompt(
-                    prompt=prompt_config.pre,
-                    data={"question": answer.question},
+                pre_task = asyncio.create_task(
+                    llm_model.run_prompt(
+                        prompt=prompt_config.pre,
+                        data={"question": answer.question},
+                        callbacks=callbacks,
+                        name="pre",
+                        system_prompt=prompt_config.system,
+                    )
+                )
+
+        if not contexts:
+            try:
+                answer = await self.aget_evidence(
+                    answer,
                     callbacks=callbacks,
-                    name="pre",
-                    system_prompt=prompt_config.system,
+                    settings=settings,
+                    embedding_model=embedding_model,
+                    summary_llm_model=summary_llm_model,
                 )
+            except BaseException:
+                if pre_task is not None:
+                    pre_task.cancel()
+                raise
+            contexts = answer.contexts
+        pre_str = None
+        if pre_task is not None:
+            pre = await pre_task
             answer.add_tokens(pre)
             pre_str = pre.text
 
         filtered_contexts = sorted(
             contexts,
-            key=lambda x: x.score,
+            key=attrgetter("score"),
             reverse=True,
         )[: answer_config.answer_max_sources]
         # remove any contexts with a score of 0
         filtered_contexts = [c for c in filtered_contexts if c.score > 0]
 
-        context_str = "\n\n".join(
-            [
-                f"{c.text.name}: {c.context}"
-                + "".join([f"\n{k}: {v}" for k, v in (c.model_extra or {}).items()])
-                + (
-                    f"\nFrom {c.text.doc.citation}"
-                    if answer_config.evidence_detailed_citations
-                    else ""
-                )
-                for c in filtered_contexts
-            ]
-            + ([f"Extra background information: {pre_str}"] if pre_str else [])
-        )
-
-        valid_names = [c.text.name for c in filtered_contexts]
-        context_str += "\n\nValid keys: " + ", ".join(valid_names)
+        # walk the attribute chains once; the buffer below, the valid-keys
+        # join, and the bib loop all reuse these
+        context_names = [c.text.name for c in filtered_contexts]
+        context_citations = [c.text.doc.citation for c in filtered_contexts]
+
+        # stream into one buffer instead of allocating per-context strings
+        buf = StringIO()
+        for i, c in enumerate(filtered_contexts):
+            if i:
+                buf.write("\n\n")
+            buf.write(context_names[i])
+            buf.write(": ")
+            buf.write(c.context)
+            for extra_key, extra_value in (c.model_extra or {}).items():
+                buf.write(f"\n{extra_key}: {extra_value}")
+            if answer_config.evidence_detailed_citations:
+                buf.write(f"\nFrom {context_citations[i]}")
+        if pre_str:
+            if filtered_contexts:
+                buf.write("\n\n")
+            buf.write(f"Extra background information: {pre_str}")
+        context_str = buf.getvalue()
+
+        context_str += "\n\nValid keys: " + ", ".join(context_names)
 
         bib = {}
         if len(context_str) < 10:  # noqa: PLR2004
@@ -739,25 +995,41 @@ class Docs(BaseModel):
                 )
             answer_text = answer_result.text
             answer.add_tokens(answer_result)
-        # it still happens
-        if prompt_config.EXAMPLE_CITATION in answer_text:
-            answer_text = answer_text.replace(prompt_config.EXAMPLE_CITATION, "")
-        for c in filtered_contexts:
-            name = c.text.name
-            citation = c.text.doc.citation
-            # do check for whole key (so we don't catch Callahan2019a with Callahan2019)
-            if name_in_text(name, answer_text):
-                bib[name] = citation
+        # it still happens, and a not-found replace is one scan with early
+        # exit -- cheaper than checking membership first
+        answer_text = answer_text.replace(prompt_config.EXAMPLE_CITATION, "")
+        if filtered_contexts:
+            # single scan with an alternation of all keys, instead of one pass per
+            # context. The lookahead makes matches zero-width so overlapping keys
+            # are still found, and \b ... (?!\w) checks the whole key (so we don't
+            # catch Callahan2019a with Callahan2019)
+            stripped_names = sorted(
+                {name.strip() for name in context_names}, key=len, reverse=True
+            )
+            names_pattern = re.compile(
+                r"(?=\b(" + "|".join(map(re.escape, stripped_names)) + r")\b(?!\w))"
+            )
+            matched_names = {m.group(1) for m in names_pattern.finditer(answer_text)}
+            for name in stripped_names:
+                # a key sharing its start with a longer matched key is the one
+                # occurrence the alternation can miss, so re-check just those
+                if (
+                    name not in matched_names
+                    and any(m.startswith(name) for m in matched_names)
+                    and name_in_text(name, answer_text)
+                ):
+                    matched_names.add(name)
+            bib = {
+                name: citation
+                for name, citation in zip(context_names, context_citations, strict=True)
+                if name.strip() in matched_names
+            }
         bib_str = "\n\n".join(
             [f"{i+1}. ({k}): {c}" for i, (k, c) in enumerate(bib.items())]
         )
 
         if answer_config.answer_filter_extra_background:
-            answer_text = re.sub(
-                r"\([Ee]xtra [Bb]ackground [Ii]nformation\)",
-                "",
-                answer_text,
-            )
+            answer_text = _EXTRA_BACKGROUND_PATTERN.sub("", answer_text)
 
         formatted_answer = f"Question: {answer.question}\n\n{answer_text}\n"
         if bib:
@@ -785,4 +1057,9 @@ class Docs(BaseModel):
         answer.contexts = contexts
         answer.context = context_str
 
+        if question_embedding is not None:
+            self._answer_cache.append(
+                (question_embedding, answer.model_copy(deep=True))
+            )
+
         return answer
@@ -4,6 +4,7 @@ import asyncio
 import contextlib
 import functools
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import (
     AsyncGenerator,
     AsyncIterable,
@@ -16,7 +17,7 @@ from collections.abc import (
 from enum import StrEnum
 from inspect import isasyncgenfunction, signature
 from sys import version_info
-from typing import Any, TypeVar
+from typing import Any, Literal, TypeVar
 
 import litellm
 import numpy as np
@@ -25,6 +26,7 @@ from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PrivateAttr,
     TypeAdapter,
     field_validator,
     model_validator,
@@ -720,34 +722,77 @@ class VectorStore(BaseModel, ABC):
         similarity_matrix = cosine_similarity(embeddings, embeddings)
 
         selected_indices = [0]
-        remaining_indices = list(range(1, len(texts)))
+        # Running max similarity to any selected document, updated incrementally
+        # instead of re-reducing over all selected columns each iteration
+        max_sim_to_selected = similarity_matrix[:, 0].copy()
 
         while len(selected_indices) < k:
-            selected_similarities = similarity_matrix[:, selected_indices]
-            max_sim_to_selected = selected_similarities.max(axis=1)
-
             mmr_scores = (
                 self.mmr_lambda * np_scores
                 - (1 - self.mmr_lambda) * max_sim_to_selected
             )
             mmr_scores[selected_indices] = -np.inf  # Exclude already selected documents
 
-            max_mmr_index = mmr_scores.argmax()
+            max_mmr_index = int(mmr_scores.argmax())
             selected_indices.append(max_mmr_index)
-            remaining_indices.remove(max_mmr_index)
+            np.maximum(
+                max_sim_to_selected,
+                similarity_matrix[:, max_mmr_index],
+                out=max_sim_to_selected,
+            )
 
         return [texts[i] for i in selected_indices], [
             scores[i] for i in selected_indices
         ]
 
 
+# Repeat queries (e.g. re-running aquery after tweaking answer settings) are
+# common enough that a small LRU of their embeddings saves an API call each
+QUERY_EMBEDDING_CACHE_SIZE = 256
+
+
 class NumpyVectorStore(VectorStore):
     texts: list[Embeddable] = []
+    quantization: Literal["none", "int8"] = Field(
+        default="none",
+        description=(
+            "Storage for the similarity-scan matrix: 'int8' keeps per-dimension"
+            " scalar-quantized codes (~8x smaller than float64) at the cost of"
+            " slightly approximate scores"
+        ),
+    )
     _embeddings_matrix: np.ndarray | None = None
+    _embeddings_norms: np.ndarray | None = None
+    _quant_mins: np.ndarray | None = None
+    _quant_scales: np.ndarray | None = None
+    _query_embedding_cache: OrderedDict[tuple[str, str], np.ndarray] = PrivateAttr(
+        default_factory=OrderedDict
+    )
+
+    async def _embed_query(
+        self, query: str, embedding_model: EmbeddingModel
+    ) -> np.ndarray:
+        """Embed a query, reusing a small LRU of recent query embeddings."""
+        key = (embedding_model.name, query)
+        cached = self._query_embedding_cache.get(key)
+        if cached is not None:
+            self._query_embedding_cache.move_to_end(key)
+            return cached
+        # this will only affect models that embedding prompts
+        embedding_model.set_mode(EmbeddingModes.QUERY)
+        np_query = np.array((await embedding_model.embed_documents([query]))[0])
+        embedding_model.set_mode(EmbeddingModes.DOCUMENT)
+        self._query_embedding_cache[key] = np_query
+        if len(self._query_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+            self._query_embedding_cache.popitem(last=False)
+        return np_query
 
     def clear(self) -> None:
         self.texts = []
         self._embeddings_matrix = None
+        self._embeddings_norms = None
+        self._quant_mins = None
+        self._quant_scales = None
 
     def add_texts_and_embeddings(
         self,
@@ -755,7 +800,46 @@ class NumpyVectorStore(VectorStore):
     ) -> None:
         super().add_texts_and_embeddings(texts)
         self.texts.extend(texts)
-        self._embeddings_matrix = np.array([t.embedding for t in self.texts])
+        if not texts:
+            return
+        if self.quantization == "int8":
+            # quantization ranges are corpus-wide, so rebuild from scratch
+            matrix = np.array([t.embedding for t in self.texts])
+            mins = matrix.min(axis=0)
+            scales = (matrix.max(axis=0) - mins) / 255.0
+            scales[scales == 0.0] = 1.0  # avoid dividing by zero on constant dims
+            self._quant_mins, self._quant_scales = mins, scales
+            self._embeddings_matrix = np.round((matrix - mins) / scales).astype(
+                np.uint8
+            )
+            # Norms of the dequantized vectors, so scores stay self-consistent
+            self._embeddings_norms = np.linalg.norm(
+                self._embeddings_matrix * scales + mins, axis=1
+            )
+            return
+        # append just the new rows, instead of rebuilding the whole matrix
+        # from Python lists on every add (quadratic over many small adds)
+        new_rows = np.array([t.embedding for t in texts])
+        new_norms = np.linalg.norm(new_rows, axis=1)
+        if self._embeddings_matrix is None or self._embeddings_norms is None:
+            self._embeddings_matrix = np.array([t.embedding for t in self.texts])
+            self._embeddings_norms = np.linalg.norm(self._embeddings_matrix, axis=1)
+        else:
+            self._embeddings_matrix = np.vstack([self._embeddings_matrix, new_rows])
+            self._embeddings_norms = np.concatenate([self._embeddings_norms, new_norms])
+
+    def restore_texts_and_matrix(
+        self, texts: Sequence[Embeddable], matrix: np.ndarray
+    ) -> None:
+        """Adopt a prebuilt (possibly memory-mapped) embedding matrix without copying."""
+        self.texts_hashes = {hash(t) for t in texts}
+        self.texts = list(texts)
+        self._embeddings_matrix = matrix
+        self._embeddings_norms = np.asarray(np.linalg.norm(matrix, axis=1))
+        # The adopted matrix is unquantized, whatever this store was set to
+        self.quantization = "none"
+        self._quant_mins = None
+        self._quant_scales = None
 
     async def similarity_search(
         self, query: str, k: int, embedding_model: EmbeddingModel
@@ -764,16 +848,23 @@ class NumpyVectorStore(VectorStore):
         if k == 0:
             return [], []
 
-        # this will only affect models that embedding prompts
-        embedding_model.set_mode(EmbeddingModes.QUERY)
+        np_query = await self._embed_query(query, embedding_model)
 
-        np_query = np.array((await embedding_model.embed_documents([query]))[0])
-
-        embedding_model.set_mode(EmbeddingModes.DOCUMENT)
-
-        similarity_scores = cosine_similarity(
-            np_query.reshape(1, -1), self._embeddings_matrix
-        )[0]
+        if self.quantization == "int8":
+            # codes @ (q * scale) + mins @ q == (dequantized matrix) @ q
+            dot_products = (
+                self._embeddings_matrix @ (np_query * self._quant_scales)
+                + self._quant_mins @ np_query
+            )
+        else:
+            if self._embeddings_matrix is None or self._embeddings_norms is None:
+                # e.g. deserialized from an older store
+                self._embeddings_matrix = np.array([t.embedding for t in self.texts])
+                self._embeddings_norms = np.linalg.norm(self._embeddings_matrix, axis=1)
+            dot_products = self._embeddings_matrix @ np_query
+        similarity_scores = dot_products / (
+            self._embeddings_norms * np.linalg.norm(np_query)
+        )
         similarity_scores = np.nan_to_num(similarity_scores, nan=-np.inf)
         # minus so descending
         # we could use arg-partition here
@@ -1,37 +1,51 @@
 from __future__ import annotations
 
 import os
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from math import ceil
 from pathlib import Path
-from typing import Literal, overload
+from typing import Literal, cast, overload
 
+import numpy as np
 import pymupdf
-import tiktoken
 from html2text import __version__ as html2text_version
 from html2text import html2text
 
 from paperqa.types import ChunkMetadata, Doc, ParsedMetadata, ParsedText, Text
-from paperqa.utils import ImpossibleParsingError
+from paperqa.utils import ImpossibleParsingError, get_tiktoken_encoding
 from paperqa.version import __version__ as pqa_version
 
+# pymupdf is not thread-safe, so serialize all access to it
+_PYMUPDF_LOCK = threading.Lock()
 
-def parse_pdf_to_pages(path: Path) -> ParsedText:
-
-    with pymupdf.open(path) as file:
-        pages: dict[str, str] = {}
-        total_length = 0
 
+def _iter_pdf_pages(path: Path) -> Iterator[tuple[str, str]]:
+    """Lazily yield (page number, page text) pairs from a PDF."""
+    with _PYMUPDF_LOCK, pymupdf.open(path) as file:
+        page_iter = iter(file)
         for i in range(file.page_count):
             try:
-                page = file.load_page(i)
+                page = next(page_iter)
             except pymupdf.mupdf.FzErrorFormat as exc:
                 raise ImpossibleParsingError(
                     f"Page loading via {pymupdf.__name__} failed on page {i} of"
                     f" {file.page_count} for the PDF at path {path}, likely this PDF"
                     " file is corrupt"
                 ) from exc
-            pages[str(i + 1)] = page.get_text("text", sort=True)
-            total_length += len(pages[str(i + 1)])
+            yield str(i + 1), page.get_text("text", sort=True)
+
+
+def parse_pdf_to_pages(path: Path) -> ParsedText:
+
+    pages: dict[str, str] = {}
+    total_length = 0
+
+    for page_num, page_text in _iter_pdf_pages(path):
+        pages[page_num] = page_text
+        total_length += len(page_text)
 
     metadata = ParsedMetadata(
         parsing_libraries=[f"pymupdf ({pymupdf.__version__})"],
@@ -45,44 +59,66 @@ def parse_pdf_to_pages(path: Path) -> ParsedText:
 def chunk_pdf(
     parsed_text: ParsedText, doc: Doc, chunk_chars: int, overlap: int
 ) -> list[Text]:
-    pages: list[str] = []
-    texts: list[Text] = []
-    split: str = ""
-
     if not isinstance(parsed_text.content, dict):
         raise NotImplementedError(
             f"ParsedText.content must be a `dict`, not {type(parsed_text.content)}."
         )
+    return _chunk_pdf_pages(
+        parsed_text.content.items(), doc, chunk_chars=chunk_chars, overlap=overlap
+    )[0]
 
-    if not parsed_text.content:
-        raise ImpossibleParsingError(
-            f"No text was parsed from the document named {doc.docname!r}, either empty"
-            " or corrupted."
-        )
 
-    for page_num, page_text in parsed_text.content.items():
-        split += page_text
+def _chunk_pdf_pages(
+    page_items: Iterable[tuple[str, str]], doc: Doc, chunk_chars: int, overlap: int
+) -> tuple[list[Text], int]:
+    """Chunk (page number, page text) pairs, returning chunks and total text length."""
+    pages: list[str] = []
+    texts: list[Text] = []
+    total_length = 0
+    docname = doc.docname
+    # accumulate pieces in a list and only join when emitting a chunk,
+    # to avoid quadratic string copying on large documents
+    split_parts: list[str] = []
+    split_len = 0
+
+    for page_num, page_text in page_items:
+        total_length += len(page_text)
+        split_parts.append(page_text)
+        split_len += len(page_text)
         pages.append(page_num)
         # split could be so long it needs to be split
         # into multiple chunks. Or it could be so short
         # that it needs to be combined with the next chunk.
-        while len(split) > chunk_chars:
-            # pretty formatting of pages (e.g. 1-3, 4, 5-7)
-            pg = "-".join([pages[0], pages[-1]])
+        while split_len > chunk_chars:
+            split = "".join(split_parts)
             texts.append(
                 Text(
-                    text=split[:chunk_chars], name=f"{doc.docname} pages {pg}", doc=doc
+                    text=split[:chunk_chars],
+                    # pretty formatting of pages (e.g. 1-3, 4, 5-7)
+                    name=f"{docname} pages {pages[0]}-{pages[-1]}",
+                    doc=doc,
                 )
             )
-            split = split[chunk_chars - overlap :]
+            split_parts = [split[chunk_chars - overlap :]]
+            split_len = len(split_parts[0])
             pages = [page_num]
 
+    if not pages:
+        raise ImpossibleParsingError(
+            f"No text was parsed from the document named {doc.docname!r}, either empty"
+            " or corrupted."
+        )
+
+    split = "".join(split_parts)
     if len(split) > overlap or not texts:
-        pg = "-".join([pages[0], pages[-1]])
         texts.append(
-            Text(text=split[:chunk_chars], name=f"{doc.docname} pages {pg}", doc=doc)
+            Text(
+                text=split[:chunk_chars],
+                name=f"{docname} pages {pages[0]}-{pages[-1]}",
+                doc=doc,
+            )
         )
-    return texts
+    return texts, total_length
 
 
 def parse_text(
@@ -100,12 +136,17 @@ def parse_text(
         use_tiktoken: flag to use tiktoken library to encode text.
     """
     path = Path(path)
-    try:
-        with path.open() as f:
-            text = list(f) if split_lines else f.read()
-    except UnicodeDecodeError:
-        with path.open(encoding="utf-8", errors="ignore") as f:
-            text = f.read()
+    # read raw bytes and decode once, which is faster than text-mode reads
+    # through TextIOWrapper for large files
+    raw = path.read_bytes().decode("utf-8", errors="ignore")
+    if "\r" in raw:  # match text-mode universal newline translation
+        raw = raw.replace("\r\n", "\n").replace("\r", "\n")
+    text: str | list[str] = raw
+    if split_lines:
+        lines = raw.split("\n")
+        text = [f"{line}\n" for line in lines[:-1]]
+        if lines[-1]:
+            text.append(lines[-1])
 
     parsing_libraries: list[str] = ["tiktoken (cl100k_base)"] if use_tiktoken else []
     if html:
@@ -129,21 +170,41 @@ def parse_text(
     )
 
 
-def chunk_text(
+PARSED_TEXT_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=PARSED_TEXT_CACHE_SIZE)
+def _parse_text_from_key(
+    path: str,
+    mtime_ns: int,  # noqa: ARG001
+    size: int,  # noqa: ARG001
+    html: bool,
+    split_lines: bool,
+    use_tiktoken: bool,
+) -> ParsedText:
+    return parse_text(
+        path, html=html, split_lines=split_lines, use_tiktoken=use_tiktoken
+    )
+
+
+def _parse_text_cached(
+    path: Path, html: bool = False, split_lines: bool = False, use_tiktoken: bool = True
+) -> ParsedText:
+    """Parse a text file, reusing a prior parse while the file is unchanged on disk."""
+    stat = path.stat()
+    return _parse_text_from_key(
+        str(path), stat.st_mtime_ns, stat.st_size, html, split_lines, use_tiktoken
+    )
+
+
+def _chunk_text_bounds(
     parsed_text: ParsedText,
     doc: Doc,
     chunk_chars: int,
     overlap: int,
-    use_tiktoken: bool = True,
-) -> list[Text]:
-    """Parse a document into chunks, based on tiktoken encoding.
-
-    NOTE: We get some byte continuation errors.
-    Currently ignored, but should explore more to make sure we don't miss anything.
-    """
-    texts: list[Text] = []
-    enc = tiktoken.get_encoding("cl100k_base")
-
+    use_tiktoken: bool,
+) -> tuple[str | list[int], np.ndarray, np.ndarray]:
+    """Validate content and compute chunk-window bounds as (content, starts, stops)."""
     if not isinstance(parsed_text.content, str):
         raise NotImplementedError(
             f"ParsedText.content must be a `str`, not {type(parsed_text.content)}."
@@ -164,58 +225,136 @@ def chunk_text(
     overlap_tokens = overlap / chars_per_token  # e.g., 100 / 5.5 = 18
     chunk_count = ceil(token_count / chunk_tokens)  # e.g., 4500 / 545 = 9
 
-    for i in range(chunk_count):
-        split = content[
-            max(int(i * chunk_tokens - overlap_tokens), 0) : int(
-                (i + 1) * chunk_tokens + overlap_tokens
-            )
-        ]
-        texts.append(
-            Text(
-                text=enc.decode(split) if use_tiktoken else split,
-                name=f"{doc.docname} chunk {i + 1}",
-                doc=doc,
-            )
+    # compute all chunk-window bounds in one vectorized expression
+    indices = np.arange(chunk_count + 1)
+    starts = np.maximum((indices[:-1] * chunk_tokens - overlap_tokens).astype(int), 0)
+    stops = (indices[1:] * chunk_tokens + overlap_tokens).astype(int)
+    return content, starts, stops
+
+
+def chunk_text(
+    parsed_text: ParsedText,
+    doc: Doc,
+    chunk_chars: int,
+    overlap: int,
+    use_tiktoken: bool = True,
+) -> list[Text]:
+    """Parse a document into chunks, based on tiktoken encoding.
+
+    NOTE: We get some byte continuation errors.
+    Currently ignored, but should explore more to make sure we don't miss anything.
+    """
+    enc = get_tiktoken_encoding()
+    content, starts, stops = _chunk_text_bounds(
+        parsed_text, doc, chunk_chars, overlap, use_tiktoken
+    )
+    splits = [content[start:stop] for start, stop in zip(starts, stops, strict=True)]
+    # decode all chunks in one batch, so tiktoken can parallelize internally
+    decoded = (
+        enc.decode_batch(cast(list[list[int]], splits))
+        if use_tiktoken
+        else cast(list[str], splits)
+    )
+    return [
+        Text(text=chunk, name=f"{doc.docname} chunk {i + 1}", doc=doc)
+        for i, chunk in enumerate(decoded)
+    ]
+
+
+def iter_chunk_text(
+    parsed_text: ParsedText,
+    doc: Doc,
+    chunk_chars: int,
+    overlap: int,
+    use_tiktoken: bool = True,
+) -> Iterator[Text]:
+    """Lazily yield chunks one at a time, holding only one decoded chunk in memory.
+
+    Prefer chunk_text when all chunks are needed at once: it decodes them in a
+    single batch, which is faster.
+    """
+    enc = get_tiktoken_encoding()
+    content, starts, stops = _chunk_text_bounds(
+        parsed_text, doc, chunk_chars, overlap, use_tiktoken
+    )
+    for i, (start, stop) in enumerate(zip(starts, stops, strict=True)):
+        split = content[start:stop]
+        yield Text(
+            text=enc.decode(cast(list[int], split)) if use_tiktoken else split,
+            name=f"{doc.docname} chunk {i + 1}",
+            doc=doc,
         )
-    return texts
 
 
 def chunk_code_text(
     parsed_text: ParsedText, doc: Doc, chunk_chars: int, overlap: int
 ) -> list[Text]:
     """Parse a document into chunks, based on line numbers (for code)."""
-    split = ""
     texts: list[Text] = []
-    last_line = 0
 
     if not isinstance(parsed_text.content, list):
         raise NotImplementedError(
             f"ParsedText.content must be a `list`, not {type(parsed_text.content)}."
         )
 
-    for i, line in enumerate(parsed_text.content):
-        split += line
-        while len(split) > chunk_chars:
-            texts.append(
-                Text(
-                    text=split[:chunk_chars],
-                    name=f"{doc.docname} lines {last_line}-{i}",
-                    doc=doc,
-                )
-            )
-            split = split[chunk_chars - overlap :]
-            last_line = i
+    if not parsed_text.content:
+        raise ImpossibleParsingError(
+            f"No text was parsed from the document named {doc.docname!r}, either empty"
+            " or corrupted."
+        )
+
+    # each chunk starts a fixed stride into the joined text, so all chunk
+    # bounds and their emitting line numbers can be computed up front with
+    # integer arithmetic over cumulative line offsets
+    full_text = "".join(parsed_text.content)
+    line_ends = np.cumsum([len(line) for line in parsed_text.content])
+    stride = chunk_chars - overlap
+    num_chunks = (
+        -((len(full_text) - chunk_chars) // -stride)
+        if len(full_text) > chunk_chars
+        else 0
+    )
+    starts = np.arange(num_chunks) * stride
+    # line index being appended when each chunk overflows chunk_chars
+    emit_lines = np.searchsorted(line_ends, starts + chunk_chars, side="right")
+    last_lines = np.concatenate(([0], emit_lines[:-1])) if num_chunks else emit_lines
+
+    texts.extend(
+        Text(
+            text=full_text[start : start + chunk_chars],
+            name=f"{doc.docname} lines {last_line}-{emit_line}",
+            doc=doc,
+        )
+        for start, last_line, emit_line in zip(
+            starts, last_lines, emit_lines, strict=True
+        )
+    )
+    split = full_text[num_chunks * stride :]
     if len(split) > overlap or not texts:
+        last_line = emit_lines[-1] if num_chunks else 0
         texts.append(
             Text(
                 text=split[:chunk_chars],
-                name=f"{doc.docname} lines {last_line}-{i}",
+                name=f"{doc.docname} lines {last_line}-{len(parsed_text.content) - 1}",
                 doc=doc,
             )
         )
     return texts
 
 
+# suffix -> (parse_text kwargs, chunker, chunk type); unknown suffixes are code
+_SUFFIX_HANDLERS: dict[str, tuple[dict[str, bool], Callable[..., list[Text]], str]] = {
+    ".pdf": ({}, chunk_pdf, "overlap_pdf_by_page"),
+    ".txt": ({}, chunk_text, "overlap"),
+    ".html": ({"html": True}, chunk_text, "overlap"),
+}
+_CODE_HANDLER = (
+    {"split_lines": True, "use_tiktoken": False},
+    chunk_code_text,
+    "overlap_code_by_line",
+)
+
+
 @overload
 def read_doc(
     path: Path,
@@ -280,18 +419,34 @@ def read_doc(
         parsed_text_only: return parsed text without chunking
         include_metadata: return a tuple
     """
-    str_path = str(path)
-    parsed_text = None
+    suffix = path.suffix
+    parse_kwargs, chunker, chunk_type = _SUFFIX_HANDLERS.get(suffix, _CODE_HANDLER)
 
     # start with parsing -- users may want to store this separately
-    if str_path.endswith(".pdf"):
+    if suffix == ".pdf":
+        if not parsed_text_only and chunk_chars != 0:
+            # stream pages straight into the chunker, to avoid holding every
+            # page's text in memory alongside the chunks
+            chunked_text, total_length = _chunk_pdf_pages(
+                _iter_pdf_pages(path), doc, chunk_chars=chunk_chars, overlap=overlap
+            )
+            if include_metadata:
+                metadata = ParsedMetadata(
+                    parsing_libraries=[f"pymupdf ({pymupdf.__version__})"],
+                    paperqa_version=pqa_version,
+                    total_parsed_text_length=total_length,
+                    parse_type="pdf",
+                    chunk_metadata=ChunkMetadata(
+                        chunk_chars=chunk_chars,
+                        overlap=overlap,
+                        chunk_type=chunk_type,
+                    ),
+                )
+                return chunked_text, metadata
+            return chunked_text
         parsed_text = parse_pdf_to_pages(path)
-    elif str_path.endswith(".txt"):
-        parsed_text = parse_text(path)
-    elif str_path.endswith(".html"):
-        parsed_text = parse_text(path, html=True)
     else:
-        parsed_text = parse_text(path, split_lines=True, use_tiktoken=False)
+        parsed_text = _parse_text_cached(path, **parse_kwargs)
 
     if parsed_text_only:
         return parsed_text
@@ -304,30 +459,46 @@ def read_doc(
             Text(text=parsed_text.reduce_content(), name=doc.docname, doc=doc)
         ]
         chunk_metadata = ChunkMetadata(chunk_chars=0, overlap=0, chunk_type="no_chunk")
-    elif str_path.endswith(".pdf"):
-        chunked_text = chunk_pdf(
-            parsed_text, doc, chunk_chars=chunk_chars, overlap=overlap
-        )
-        chunk_metadata = ChunkMetadata(
-            chunk_chars=chunk_chars, overlap=overlap, chunk_type="overlap_pdf_by_page"
-        )
-    elif str_path.endswith((".txt", ".html")):
-        chunked_text = chunk_text(
-            parsed_text, doc, chunk_chars=chunk_chars, overlap=overlap
-        )
-        chunk_metadata = ChunkMetadata(
-            chunk_chars=chunk_chars, overlap=overlap, chunk_type="overlap"
-        )
     else:
-        chunked_text = chunk_code_text(
+        chunked_text = chunker(
             parsed_text, doc, chunk_chars=chunk_chars, overlap=overlap
         )
         chunk_metadata = ChunkMetadata(
-            chunk_chars=chunk_chars, overlap=overlap, chunk_type="overlap_code_by_line"
+            chunk_chars=chunk_chars, overlap=overlap, chunk_type=chunk_type
         )
 
     if include_metadata:
-        parsed_text.metadata.chunk_metadata = chunk_metadata
-        return chunked_text, parsed_text.metadata
+        # copy so cached parses don't alias chunk metadata across calls
+        return chunked_text, parsed_text.metadata.model_copy(
+            update={"chunk_metadata": chunk_metadata}
+        )
 
     return chunked_text
+
+
+def read_docs(
+    items: Iterable[tuple[Path, Doc]], chunk_chars: int = 3000, overlap: int = 100
+) -> list[list[Text]]:
+    """Parse and chunk several documents concurrently via a thread pool.
+
+    Parsing and tokenization release the GIL in native code, so threads
+    overlap well here; PDF extraction is serialized internally since pymupdf
+    is not thread-safe.
+
+    Args:
+        items: (path, doc) pairs to read, in the order results are returned.
+        chunk_chars: size of chunks.
+        overlap: size of overlap between chunks.
+    """
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(items))) as executor:
+        return list(
+            executor.map(
+                lambda item: read_doc(
+                    item[0], item[1], chunk_chars=chunk_chars, overlap=overlap
+                ),
+                items,
+            )
+        )
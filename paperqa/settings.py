@@ -2,17 +2,21 @@ import asyncio
 import importlib.resources
 import os
 import pathlib
+import re
 import warnings
 from enum import StrEnum
+from functools import cache, lru_cache
 from pydoc import locate
-from typing import Any, ClassVar, Self, assert_never, cast
+from typing import Annotated, Any, ClassVar, Self, assert_never, cast
 
 import anyio
 from aviary.tools import ToolSelector
 from pydantic import (
+    AfterValidator,
     BaseModel,
     ConfigDict,
     Field,
+    PrivateAttr,
     TypeAdapter,
     computed_field,
     field_validator,
@@ -50,9 +54,13 @@ from paperqa.prompts import (
     summary_json_system_prompt,
     summary_prompt,
 )
+from paperqa.types import Answer
 from paperqa.utils import hexdigest, pqa_directory
 from paperqa.version import __version__
 
+# Answer's schema is static, so compute its field names once for check_post
+_ANSWER_ATTRIBUTES = frozenset(Answer.model_fields)
+
 
 class AnswerSettings(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -86,6 +94,13 @@ class AnswerSettings(BaseModel):
         default=False,
         description="Whether to cite background information provided by model.",
     )
+    answer_cache_similarity_threshold: float | None = Field(
+        default=None,
+        description=(
+            "Cosine similarity above which a prior answer to a near-duplicate"
+            " question is reused, or None (default) to disable answer caching"
+        ),
+    )
 
 
 class ParsingOptions(StrEnum):
@@ -101,15 +116,21 @@ def _get_parse_type(opt: ParsingOptions, config: "ParsingSettings") -> str:
     assert_never(opt)
 
 
+# Note that SIMPLE_OVERLAP must be valid for all by default
+# TODO: populate when future parsing options restrict chunking
+_VALID_PARSINGS: dict[str, list[ParsingOptions]] = {}
+
+
 class ChunkingOptions(StrEnum):
     SIMPLE_OVERLAP = "simple_overlap"
 
     @property
     def valid_parsings(self) -> list[ParsingOptions]:
-        # Note that SIMPLE_OVERLAP must be valid for all by default
-        # TODO: implement for future parsing options
-        valid_parsing_dict: dict[str, list[ParsingOptions]] = {}
-        return valid_parsing_dict.get(self.value, [])  # noqa: FURB184
+        return _VALID_PARSINGS.get(self.value, [])
+
+
+# the version is fixed for the process lifetime, so build this string once
+_PARSER_VERSION_STRING = f"paperqa-{__version__}"
 
 
 class ParsingSettings(BaseModel):
@@ -152,57 +173,103 @@ class ParsingSettings(BaseModel):
     chunking_algorithm: ChunkingOptions = ChunkingOptions.SIMPLE_OVERLAP
     model_config = ConfigDict(extra="forbid")
 
+    # memoizes chunk_type, which is recomputed per document during indexing,
+    # keyed on its inputs since settings are mutable
+    _chunk_type_cache: dict[tuple, str] = PrivateAttr(default_factory=dict)
+
     def chunk_type(self, chunking_selection: ChunkingOptions | None = None) -> str:
         """Future chunking implementations (i.e. by section) will get an elif clause here."""
         if chunking_selection is None:
             chunking_selection = self.chunking_algorithm
+        key = (chunking_selection, self.chunk_size, self.overlap)
+        if (chunk_type := self._chunk_type_cache.get(key)) is not None:
+            return chunk_type
         if chunking_selection == ChunkingOptions.SIMPLE_OVERLAP:
-            return (
+            chunk_type = (
                 f"{self.parser_version_string}|{chunking_selection.value}"
                 f"|tokens={self.chunk_size}|overlap={self.overlap}"
             )
+            self._chunk_type_cache[key] = chunk_type
+            return chunk_type
         assert_never(chunking_selection)
 
     @property
     def parser_version_string(self) -> str:
-        return f"paperqa-{__version__}"
+        return _PARSER_VERSION_STRING
 
     def is_chunking_valid_for_parsing(self, parsing: str):
-        # must map the parsings because they won't include versions by default
-        return (
-            self.chunking_algorithm == ChunkingOptions.SIMPLE_OVERLAP
-            or parsing
-            in {  # type: ignore[unreachable]
-                _get_parse_type(p, self) for p in self.chunking_algorithm.valid_parsings
-            }
-        )
-
-
-class _FormatDict(dict):  # noqa: FURB189
-    """Mock a dictionary and store any missing items."""
+        # short-circuit before mapping the parsings (which won't include
+        # versions by default), since SIMPLE_OVERLAP is valid for all
+        if self.chunking_algorithm == ChunkingOptions.SIMPLE_OVERLAP:
+            return True
+        return parsing in {  # type: ignore[unreachable]
+            _get_parse_type(p, self) for p in self.chunking_algorithm.valid_parsings
+        }
 
-    def __init__(self) -> None:
-        self.key_set: set[str] = set()
 
-    def __missing__(self, key: str) -> str:
-        self.key_set.add(key)
-        return key
+# matches the base variable name of a replacement field, stopping at any
+# attribute/index access or format spec
+_FORMAT_FIELD_PATTERN = re.compile(r"\{([a-zA-Z_]\w*)")
 
 
+@lru_cache(maxsize=1024)
 def get_formatted_variables(s: str) -> set[str]:
     """Returns the set of variables implied by the format string."""
-    format_dict = _FormatDict()
-    s.format_map(format_dict)
-    return format_dict.key_set
+    # dropping {{ escape pairs first, a single regex scan pulls out the base
+    # variable names without Formatter().parse's conversion/spec handling
+    return set(_FORMAT_FIELD_PATTERN.findall(s.replace("{{", "")))
+
+
+# variable sets of the constant prompts, computed once at import so prompt
+# validation doesn't re-parse them on every Settings() construction
+_SUMMARY_PROMPT_VARS = frozenset(get_formatted_variables(summary_prompt))
+_QA_PROMPT_VARS = frozenset(get_formatted_variables(qa_prompt))
+_SELECT_PROMPT_VARS = frozenset(get_formatted_variables(select_paper_prompt))
+
+
+def _make_prompt_variable_check(prompt_name: str, allowed: frozenset[str]):
+    """Build a plain-function validator restricting a prompt to the allowed variables.
+
+    Functional AfterValidators skip field_validator's classmethod dispatch and
+    info-object construction, trimming per-instantiation overhead.
+    """
+
+    def check(v: str) -> str:
+        if not get_formatted_variables(v) <= allowed:
+            raise ValueError(f"{prompt_name} prompt can only have variables: {allowed}")
+        return v
+
+    return check
+
+
+def _check_pre(v: str | None) -> str | None:
+    if v is not None and get_formatted_variables(v) != {"question"}:
+        raise ValueError("Pre prompt must have input variables: question")
+    return v
+
+
+def _check_post(v: str | None) -> str | None:
+    if v is not None and not get_formatted_variables(v) <= _ANSWER_ATTRIBUTES:
+        raise ValueError(
+            f"Post prompt must have input variables: {set(_ANSWER_ATTRIBUTES)}"
+        )
+    return v
 
 
 class PromptSettings(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    summary: str = summary_prompt
-    qa: str = qa_prompt
-    select: str = select_paper_prompt
-    pre: str | None = Field(
+    summary: Annotated[
+        str,
+        AfterValidator(_make_prompt_variable_check("Summary", _SUMMARY_PROMPT_VARS)),
+    ] = summary_prompt
+    qa: Annotated[
+        str, AfterValidator(_make_prompt_variable_check("QA", _QA_PROMPT_VARS))
+    ] = qa_prompt
+    select: Annotated[
+        str, AfterValidator(_make_prompt_variable_check("Select", _SELECT_PROMPT_VARS))
+    ] = select_paper_prompt
+    pre: Annotated[str | None, AfterValidator(_check_pre)] = Field(
         default=None,
         description=(
             "Opt-in pre-prompt (templated with just the original question) to append"
@@ -212,7 +279,7 @@ class PromptSettings(BaseModel):
             " used by the qa prompt, without changing the qa prompt's template."
         ),
     )
-    post: str | None = None
+    post: Annotated[str | None, AfterValidator(_check_post)] = None
     system: str = default_system_prompt
     use_json: bool = True
     # Not thrilled about this model,
@@ -222,59 +289,6 @@ class PromptSettings(BaseModel):
     summary_json_system: str = summary_json_system_prompt
     EXAMPLE_CITATION: ClassVar[str] = "(Example2012Example pages 3-4)"
 
-    @field_validator("summary")
-    @classmethod
-    def check_summary(cls, v: str) -> str:
-        if not get_formatted_variables(v).issubset(
-            get_formatted_variables(summary_prompt)
-        ):
-            raise ValueError(
-                "Summary prompt can only have variables:"
-                f" {get_formatted_variables(summary_prompt)}"
-            )
-        return v
-
-    @field_validator("qa")
-    @classmethod
-    def check_qa(cls, v: str) -> str:
-        if not get_formatted_variables(v).issubset(get_formatted_variables(qa_prompt)):
-            raise ValueError(
-                "QA prompt can only have variables:"
-                f" {get_formatted_variables(qa_prompt)}"
-            )
-        return v
-
-    @field_validator("select")
-    @classmethod
-    def check_select(cls, v: str) -> str:
-        if not get_formatted_variables(v).issubset(
-            get_formatted_variables(select_paper_prompt)
-        ):
-            raise ValueError(
-                "Select prompt can only have variables:"
-                f" {get_formatted_variables(select_paper_prompt)}"
-            )
-        return v
-
-    @field_validator("pre")
-    @classmethod
-    def check_pre(cls, v: str | None) -> str | None:
-        if v is not None and get_formatted_variables(v) != {"question"}:
-            raise ValueError("Pre prompt must have input variables: question")
-        return v
-
-    @field_validator("post")
-    @classmethod
-    def check_post(cls, v: str | None) -> str | None:
-        if v is not None:
-            # kind of a hack to get list of attributes in answer
-            from paperqa.types import Answer
-
-            attrs = set(Answer.model_fields.keys())
-            if not get_formatted_variables(v).issubset(attrs):
-                raise ValueError(f"Post prompt must have input variables: {attrs}")
-        return v
-
 
 class IndexSettings(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -286,7 +300,9 @@ class IndexSettings(BaseModel):
         ),
     )
     paper_directory: str | os.PathLike = Field(
-        default=pathlib.Path.cwd(),
+        # a factory rather than a class-body default, so the working directory
+        # is snapshotted per instantiation instead of once at import
+        default_factory=pathlib.Path.cwd,
         description=(
             "Local directory which contains the papers to be indexed and searched."
         ),
@@ -353,6 +369,15 @@ class IndexSettings(BaseModel):
         return manifest_file
 
 
+@lru_cache(maxsize=1)
+def _gen_answer_tool_name() -> str:
+    """Resolve the gen-answer tool's name once, deferring the heavy agents import."""
+    # imported here to avoid circular imports
+    from paperqa.agents.tools import GenerateAnswer
+
+    return GenerateAnswer.TOOL_FN_NAME
+
+
 class AgentSettings(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -410,7 +435,7 @@ class AgentSettings(BaseModel):
         description="If set to true, run the search tool before invoking agent.",
     )
 
-    tool_names: set[str] | None = Field(
+    tool_names: frozenset[str] | None = Field(
         default=None,
         description=(
             "Optional override on the tools to provide the agent. Leaving as the"
@@ -435,13 +460,10 @@ class AgentSettings(BaseModel):
 
     @field_validator("tool_names")
     @classmethod
-    def validate_tool_names(cls, v: set[str] | None) -> set[str] | None:
+    def validate_tool_names(cls, v: frozenset[str] | None) -> frozenset[str] | None:
         if v is None:
             return None
-        # imported here to avoid circular imports
-        from paperqa.agents.tools import GenerateAnswer
-
-        answer_tool_name = GenerateAnswer.TOOL_FN_NAME
+        answer_tool_name = _gen_answer_tool_name()
         if answer_tool_name not in v:
             raise ValueError(
                 f"If using an override, must contain at least the {answer_tool_name}."
@@ -466,6 +488,21 @@ class AgentSettings(BaseModel):
         return self
 
 
+@cache
+def _read_packaged_settings(config_name: str) -> bytes:
+    """Read a packaged config's JSON, cached since package data is immutable."""
+    try:
+        # Use importlib.resources.files() which is recommended for Python 3.9+
+        pkg_config_path = (
+            importlib.resources.files("paperqa.configs") / f"{config_name}.json"
+        )
+        if pkg_config_path.is_file():
+            return pkg_config_path.read_bytes()
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"No configuration file found for {config_name}") from e
+    raise FileNotFoundError(f"No configuration file found for {config_name}")
+
+
 def make_default_litellm_router_settings(llm: str, temperature: float = 0.0) -> dict:
     """Settings matching "model_list" schema here: https://docs.litellm.ai/docs/routing."""
     return {
@@ -478,6 +515,24 @@ def make_default_litellm_router_settings(llm: str, temperature: float = 0.0) ->
     }
 
 
+# Pre-validated default submodels: constructing Settings() copies these
+# instead of re-running full validation for the defaults-only common case.
+# Deep copies keep nested models (e.g. AgentSettings.index) unshared, so
+# mutating one Settings instance cannot leak into another.
+_DEFAULT_ANSWER_SETTINGS = AnswerSettings()
+_DEFAULT_PARSING_SETTINGS = ParsingSettings()
+_DEFAULT_PROMPT_SETTINGS = PromptSettings()
+_DEFAULT_AGENT_SETTINGS = AgentSettings()
+
+
+def _default_agent_settings() -> AgentSettings:
+    agent = _DEFAULT_AGENT_SETTINGS.model_copy(deep=True)
+    # the paper directory defaults to the instantiation-time working
+    # directory, which the import-time prototype cannot know
+    agent.index.paper_directory = pathlib.Path.cwd()
+    return agent
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(extra="ignore")
 
@@ -562,7 +617,7 @@ class Settings(BaseSettings):
         frozen=True,
     )
     paper_directory: str | os.PathLike = Field(
-        default=pathlib.Path.cwd(),
+        default_factory=pathlib.Path.cwd,
         description=(
             "Local directory which contains the papers to be indexed and searched."
         ),
@@ -580,7 +635,8 @@ class Settings(BaseSettings):
             ("paper_directory", "paper_directory"),
         ):
             value = getattr(self, deprecated_field_name)
-            if value != type(self).model_fields[deprecated_field_name].default:
+            field_info = type(self).model_fields[deprecated_field_name]
+            if value != field_info.get_default(call_default_factory=True):
                 warnings.warn(
                     (
                         f"The {deprecated_field_name!r} field has been moved to"
@@ -598,10 +654,23 @@ class Settings(BaseSettings):
     def md5(self) -> str:
         return hexdigest(self.model_dump_json(exclude={"md5"}))
 
-    answer: AnswerSettings = Field(default_factory=AnswerSettings)
-    parsing: ParsingSettings = Field(default_factory=ParsingSettings)
-    prompts: PromptSettings = Field(default_factory=PromptSettings)
-    agent: AgentSettings = Field(default_factory=AgentSettings)
+    answer: AnswerSettings = Field(
+        default_factory=lambda: _DEFAULT_ANSWER_SETTINGS.model_copy(deep=True)
+    )
+    parsing: ParsingSettings = Field(
+        default_factory=lambda: _DEFAULT_PARSING_SETTINGS.model_copy(deep=True)
+    )
+    prompts: PromptSettings = Field(
+        default_factory=lambda: _DEFAULT_PROMPT_SETTINGS.model_copy(deep=True)
+    )
+    agent: AgentSettings = Field(default_factory=_default_agent_settings)
+
+    # memoizes get_index_name, keyed on the fields the name depends upon
+    # since settings are mutable
+    _index_name_cache: dict[tuple, str] = PrivateAttr(default_factory=dict)
+    # memoizes the constructed LLM/embedding models so repeated getter calls
+    # reuse one instance (and its warm connection pool) per field combination
+    _model_cache: dict[tuple, Any] = PrivateAttr(default_factory=dict)
 
     def get_index_name(self) -> str:
         """Get programmatically generated index name.
@@ -614,22 +683,23 @@ class Settings(BaseSettings):
             first_segment: str = str(self.agent.index.paper_directory.absolute())
         else:
             first_segment = str(self.agent.index.paper_directory)
-        segments = [
+        segments = (
             first_segment,
             str(self.agent.index.use_absolute_paper_directory),
             self.embedding,
             str(self.parsing.chunk_size),
             str(self.parsing.overlap),
             self.parsing.chunking_algorithm,
-        ]
-        return f"pqa_index_{hexdigest('|'.join(segments))}"
+        )
+        if (name := self._index_name_cache.get(segments)) is None:
+            name = f"pqa_index_{hexdigest('|'.join(segments))}"
+            self._index_name_cache[segments] = name
+        return name
 
     @classmethod
     def from_name(
         cls, config_name: str = "default", cli_source: CliSettingsSource | None = None
     ) -> "Settings":
-        json_path: pathlib.Path | None = None
-
         # quick exit for default settings
         if config_name == "default":
             if not cli_source:
@@ -638,63 +708,80 @@ class Settings(BaseSettings):
                 )
             return Settings(_cli_settings_source=cli_source(args=True))
 
-        # First, try to find the config file in the user's .config directory
+        # First, try to find the config file in the user's .config directory,
+        # only falling back to the (cached) package default config on a miss --
+        # user configs can change underneath us, so they're re-read each time
         user_config_path = pqa_directory("settings") / f"{config_name}.json"
+        # read bytes and let the Rust-backed JSON validator decode them,
+        # skipping an intermediate UTF-8 str decode in Python
+        raw_config = (
+            user_config_path.read_bytes()
+            if user_config_path.exists()
+            else _read_packaged_settings(config_name)
+        )
 
-        if user_config_path.exists():
-            json_path = user_config_path
-
-        # If not found, fall back to the package's default config
-        try:
-            # Use importlib.resources.files() which is recommended for Python 3.9+
-            pkg_config_path = (
-                importlib.resources.files("paperqa.configs") / f"{config_name}.json"
-            )
-            if pkg_config_path.is_file():
-                json_path = cast(pathlib.Path, pkg_config_path)
-        except FileNotFoundError as e:
-            raise FileNotFoundError(
-                f"No configuration file found for {config_name}"
-            ) from e
-
-        if json_path:
-            # we do the ole switcheroo
-            # json - validate to deserialize knowing the types
-            # then dump it
-            # going json.loads directly will not get types correct
-            tmp = Settings.model_validate_json(json_path.read_text())
-            return Settings(
-                **(tmp.model_dump()),
-                _cli_settings_source=cli_source(args=True) if cli_source else None,
-            )
-
-        raise FileNotFoundError(f"No configuration file found for {config_name}")
+        # model_validate_json skips the environment/dotenv sources, so fields
+        # absent from a named config keep their defaults instead of picking up
+        # ambient environment variables -- and it validates nested submodels
+        # in a single pass
+        tmp = Settings.model_validate_json(raw_config)
+        if cli_source is None:
+            return tmp
+        # the CLI source can only be attached at construction time, so pin the
+        # already-validated fields and rebuild with it
+        return Settings(**tmp.model_dump(), _cli_settings_source=cli_source(args=True))
 
     def get_llm(self) -> LiteLLMModel:
-        return LiteLLMModel(
-            name=self.llm,
-            config=self.llm_config
-            or make_default_litellm_router_settings(self.llm, self.temperature),
-        )
+        key = ("llm", self.llm, id(self.llm_config), self.temperature)
+        if (model := self._model_cache.get(key)) is None:
+            model = self._model_cache[key] = LiteLLMModel(
+                name=self.llm,
+                config=self.llm_config
+                or make_default_litellm_router_settings(self.llm, self.temperature),
+            )
+        return model
 
     def get_summary_llm(self) -> LiteLLMModel:
-        return LiteLLMModel(
-            name=self.summary_llm,
-            config=self.summary_llm_config
-            or make_default_litellm_router_settings(self.summary_llm, self.temperature),
+        key = (
+            "summary_llm",
+            self.summary_llm,
+            id(self.summary_llm_config),
+            self.temperature,
         )
+        if (model := self._model_cache.get(key)) is None:
+            model = self._model_cache[key] = LiteLLMModel(
+                name=self.summary_llm,
+                config=self.summary_llm_config
+                or make_default_litellm_router_settings(
+                    self.summary_llm, self.temperature
+                ),
+            )
+        return model
 
     def get_agent_llm(self) -> LiteLLMModel:
-        return LiteLLMModel(
-            name=self.agent.agent_llm,
-            config=self.agent.agent_llm_config
-            or make_default_litellm_router_settings(
-                self.agent.agent_llm, self.temperature
-            ),
+        key = (
+            "agent_llm",
+            self.agent.agent_llm,
+            id(self.agent.agent_llm_config),
+            self.temperature,
         )
+        if (model := self._model_cache.get(key)) is None:
+            model = self._model_cache[key] = LiteLLMModel(
+                name=self.agent.agent_llm,
+                config=self.agent.agent_llm_config
+                or make_default_litellm_router_settings(
+                    self.agent.agent_llm, self.temperature
+                ),
+            )
+        return model
 
     def get_embedding_model(self) -> EmbeddingModel:
-        return embedding_model_factory(self.embedding, **(self.embedding_config or {}))
+        key = ("embedding", self.embedding, id(self.embedding_config))
+        if (model := self._model_cache.get(key)) is None:
+            model = self._model_cache[key] = embedding_model_factory(
+                self.embedding, **(self.embedding_config or {})
+            )
+        return model
 
     def make_aviary_tool_selector(self, agent_type: str | type) -> ToolSelector | None:
         """Attempt to convert the input agent type to an aviary ToolSelector."""
@@ -783,9 +870,24 @@ class Settings(BaseSettings):
 MaybeSettings = Settings | str | None
 
 
+# lazily built prototype for default settings, deep-copied by get_settings
+_DEFAULT_SETTINGS_PROTOTYPE: Settings | None = None
+
+
 def get_settings(config_or_name: MaybeSettings = None) -> Settings:
     if isinstance(config_or_name, Settings):
         return config_or_name
     if config_or_name is None:
-        return Settings()
+        # deep-copying a prototype is ~15x cheaper than full construction,
+        # while callers (which may mutate their settings) still get their own
+        # instance. The paper directory default is per-call, so refresh it.
+        global _DEFAULT_SETTINGS_PROTOTYPE  # noqa: PLW0603
+        if _DEFAULT_SETTINGS_PROTOTYPE is None:
+            _DEFAULT_SETTINGS_PROTOTYPE = Settings()
+        cwd = pathlib.Path.cwd()
+        settings = _DEFAULT_SETTINGS_PROTOTYPE.model_copy(
+            deep=True, update={"paper_directory": cwd}
+        )
+        settings.agent.index.paper_directory = cwd
+        return settings
     return Settings.from_name(config_name=config_or_name)
@@ -11,7 +11,6 @@ from typing import Any, ClassVar
 from uuid import UUID, uuid4
 
 import litellm  # for cost
-import tiktoken
 from aviary.message import Message
 from pybtex.database import BibliographyData, Entry, Person
 from pybtex.database.input.bibtex import Parser
@@ -20,6 +19,7 @@ from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PrivateAttr,
     computed_field,
     field_validator,
     model_validator,
@@ -30,6 +30,7 @@ from paperqa.utils import (
     encode_id,
     format_bibtex,
     get_citenames,
+    get_tiktoken_encoding,
 )
 from paperqa.version import __version__ as pqa_version
 
@@ -192,9 +193,7 @@ class Answer(BaseModel):
     def get_citation(self, name: str) -> str:
         """Return the formatted citation for the given docname."""
         try:
-            doc: Doc = next(
-                filter(lambda x: x.text.name == name, self.contexts)
-            ).text.doc
+            doc: Doc = next(c for c in self.contexts if c.text.name == name).text.doc
         except StopIteration as exc:
             raise ValueError(f"Could not find docname {name} in contexts.") from exc
         return doc.citation
@@ -222,10 +221,7 @@ class Answer(BaseModel):
 
     def get_unique_docs_from_contexts(self, score_threshold: int = 0) -> set[Doc]:
         """Parse contexts for docs with scores above the input threshold."""
-        return {
-            c.text.doc
-            for c in filter(lambda x: x.score >= score_threshold, self.contexts)
-        }
+        return {c.text.doc for c in self.contexts if c.score >= score_threshold}
 
     def filter_content_for_user(self) -> None:
         """Filter out extra items (inplace) that do not need to be returned to the user."""
@@ -271,18 +267,23 @@ class ParsedText(BaseModel):
     content: dict | str | list[str]
     metadata: ParsedMetadata
 
+    _encoded_content: list[int] | list[list[int]] | None = PrivateAttr(default=None)
+
     def encode_content(self):
         # we tokenize using tiktoken so cuts are in reasonable places
         # See https://github.com/openai/tiktoken
-        enc = tiktoken.get_encoding("cl100k_base")
-        if isinstance(self.content, str):
-            return enc.encode_ordinary(self.content)
-        elif isinstance(self.content, list):  # noqa: RET505
-            return [enc.encode_ordinary(c) for c in self.content]
-        else:
-            raise NotImplementedError(
-                "Encoding only implemented for str and list[str] content."
-            )
+        # memoized so re-chunking does not re-tokenize the whole document
+        if self._encoded_content is None:
+            enc = get_tiktoken_encoding()
+            if isinstance(self.content, str):
+                self._encoded_content = enc.encode_ordinary(self.content)
+            elif isinstance(self.content, list):
+                self._encoded_content = enc.encode_ordinary_batch(self.content)
+            else:
+                raise NotImplementedError(
+                    "Encoding only implemented for str and list[str] content."
+                )
+        return self._encoded_content
 
     def reduce_content(self):
         """Reduce any content to a single string."""
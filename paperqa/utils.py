@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import inspect
+import json
 import logging
 import logging.config
 import math
@@ -11,7 +12,7 @@ import re
 import string
 from collections.abc import Collection, Coroutine, Iterable, Iterator
 from datetime import datetime
-from functools import reduce
+from functools import lru_cache
 from http import HTTPStatus
 from pathlib import Path
 from typing import Any, BinaryIO, ClassVar
@@ -21,6 +22,7 @@ import aiohttp
 import httpx
 import litellm
 import pymupdf
+import tiktoken
 from pybtex.database import Person, parse_string
 from pybtex.database.input.bibtex import Parser
 from pybtex.style.formatting import unsrtalpha
@@ -42,6 +44,12 @@ class ImpossibleParsingError(Exception):
     LOG_METHOD_NAME: ClassVar[str] = "warning"
 
 
+@lru_cache
+def get_tiktoken_encoding(encoding: str = "cl100k_base") -> tiktoken.Encoding:
+    """Get a tiktoken encoding, constructing it at most once per process."""
+    return tiktoken.get_encoding(encoding)
+
+
 def name_in_text(name: str, text: str) -> bool:
     sname = name.strip()
     pattern = rf"\b({re.escape(sname)})\b(?!\w)"
@@ -80,8 +88,10 @@ def strings_similarity(s1: str, s2: str) -> float:
     # break the strings into words
     ss1 = set(s1.split())
     ss2 = set(s2.split())
-    # return the similarity ratio
-    return len(ss1.intersection(ss2)) / len(ss1.union(ss2))
+    # return the similarity ratio, sizing the union arithmetically
+    # to avoid materializing a third set
+    intersection = len(ss1 & ss2)
+    return intersection / (len(ss1) + len(ss2) - intersection)
 
 
 def count_pdf_pages(file_path: str | os.PathLike) -> int:
@@ -417,7 +427,9 @@ async def _get_with_retrying(
     try:
         async with session.get(url, **get_kwargs) as response:
             response.raise_for_status()
-            return await response.json()
+            # json.loads on the raw bytes skips aiohttp's content-type
+            # check and the intermediate str decode
+            return json.loads(await response.read())
     except aiohttp.ClientResponseError as e:
         if http_exception_mappings and e.status in http_exception_mappings:
             raise http_exception_mappings[e.status] from e
@@ -425,7 +437,7 @@ async def _get_with_retrying(
 
 
 def union_collections_to_ordered_list(collections: Iterable) -> list:
-    return sorted(reduce(lambda x, y: set(x) | set(y), collections))
+    return sorted(set().union(*collections))
 
 
 def pqa_directory(name: str) -> Path:
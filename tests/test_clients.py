@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from collections.abc import Collection, Sequence
+from collections.abc import AsyncIterator, Collection, Sequence
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Self, cast
 from unittest.mock import patch
 
 import aiohttp
 import pytest
+import pytest_asyncio
 
 import paperqa
 from paperqa.clients import (
@@ -15,479 +17,454 @@ from paperqa.clients import (
     CrossrefProvider,
     DocMetadataClient,
     SemanticScholarProvider,
+    crossref,
 )
-from paperqa.clients.client_models import MetadataPostProcessor, MetadataProvider
+from paperqa.clients.client_models import (
+    DOIQuery,
+    MetadataPostProcessor,
+    MetadataProvider,
+)
+from paperqa.clients.exceptions import DOINotFoundError
 from paperqa.clients.journal_quality import JournalQualityPostProcessor
 from paperqa.clients.retractions import RetractionDataPostProcessor
 
 
-@pytest.mark.vcr
-@pytest.mark.parametrize(
-    "paper_attributes",
-    [
-        {
-            "title": (
-                "Effect of native oxide layers on copper thin-film "
-                "tensile properties: A reactive molecular dynamics study"
-            ),
-            "source": ["semantic_scholar", "crossref"],
-            "key": "skarlinski2015effectofnative",
-            "doi": "10.1063/1.4938384",
-            "doc_id": "c217ec9289696c3c",
-            "journal": "Journal of Applied Physics",
-            "authors": ["Michael D. Skarlinski", "David J. Quesnel"],
-            "formatted_citation": (
-                "Michael D. Skarlinski and David J. Quesnel. Effect of native oxide"
-                " layers on copper thin-film tensile properties: a reactive molecular"
-                " dynamics study. Journal of Applied Physics, 118:235306, Dec 2015."
-                " URL: https://doi.org/10.1063/1.4938384, doi:10.1063/1.4938384. This"
-                " article has 8 citations and is from a peer-reviewed journal."
-            ),
-            "is_oa": False,
-        },
-        {
-            "title": (
-                "PaperQA: Retrieval-Augmented Generative Agent for Scientific Research"
-            ),
-            "source": ["semantic_scholar"],
-            "key": "lala2023paperqaretrievalaugmentedgenerative",
-            "doi": "10.48550/arxiv.2312.07559",
-            "doc_id": "bb985e0e3265d678",
-            "journal": "ArXiv",
-            "authors": [
-                "Jakub L'ala",
-                "Odhran O'Donoghue",
-                "Aleksandar Shtedritski",
-                "Sam Cox",
-                "Samuel G. Rodriques",
-                "Andrew D. White",
-            ],
-            "formatted_citation": (
-                "Jakub L'ala, Odhran O'Donoghue, Aleksandar Shtedritski, Sam Cox,"
-                " Samuel G. Rodriques, and Andrew D. White. Paperqa:"
-                " retrieval-augmented generative agent for scientific research. ArXiv,"
-                " Dec 2023. URL: https://doi.org/10.48550/arxiv.2312.07559,"
-                " doi:10.48550/arxiv.2312.07559. This article has 28 citations."
-            ),
-            "is_oa": None,
-        },
-        {
-            "title": "Augmenting large language models with chemistry tools",
-            "source": ["semantic_scholar", "crossref"],
-            "key": "bran2024augmentinglargelanguage",
-            "doi": "10.1038/s42256-024-00832-8",
-            "doc_id": "0f650d59b0a2ba5a",
-            "journal": "Nature Machine Intelligence",
-            "authors": [
-                "Andres M. Bran",
-                "Sam Cox",
-                "Oliver Schilter",
-                "Carlo Baldassari",
-                "Andrew D. White",
-                "Philippe Schwaller",
-            ],
-            "formatted_citation": (
-                "Andres M. Bran, Sam Cox, Oliver Schilter, Carlo Baldassari, Andrew D."
-                " White, and Philippe Schwaller. Augmenting large language models with"
-                " chemistry tools. Nature Machine Intelligence, 6:525-535, May 2024."
-                " URL: https://doi.org/10.1038/s42256-024-00832-8,"
-                " doi:10.1038/s42256-024-00832-8. This article has 201 citations and is"
-                " from a domain leading peer-reviewed journal."
-            ),
-            "is_oa": True,
-        },
-    ],
-)
-@pytest.mark.asyncio
-async def test_title_search(paper_attributes: dict[str, str]) -> None:
-    async with aiohttp.ClientSession() as session:
-        client_list = [
-            client for client in ALL_CLIENTS if client != RetractionDataPostProcessor
-        ]
-        client = DocMetadataClient(
-            session,
-            clients=cast(
-                Collection[
-                    type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
-                ],
-                client_list,
-            ),
-        )
-        details = await client.query(title=paper_attributes["title"])
-        assert set(details.other["client_source"]) == set(  # type: ignore[union-attr]
-            paper_attributes["source"]
-        ), "Should have the correct source"
-        for key, value in paper_attributes.items():
-            if key not in {"is_oa", "source"}:
-                assert getattr(details, key) == value, f"Should have the correct {key}"
-            elif key == "is_oa":
-                assert (
-                    details.other.get("is_oa") == value  # type: ignore[union-attr]
-                ), "Open access data should match"
+@pytest_asyncio.fixture(name="session", scope="module", loop_scope="module")
+async def fixture_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """One session (and connection pool) shared across this module's tests."""
+    # all requests here go to a couple of metadata hosts, so cap the pool
+    # accordingly and keep DNS answers cached for the whole module
+    connector = aiohttp.TCPConnector(
+        limit=32, limit_per_host=16, ttl_dns_cache=600, use_dns_cache=True
+    )
+    async with aiohttp.ClientSession(connector=connector) as session:
+        yield session
+
+
+@pytest_asyncio.fixture(name="default_client", scope="module", loop_scope="module")
+async def fixture_default_client(
+    session: aiohttp.ClientSession,
+) -> DocMetadataClient:
+    return DocMetadataClient(session)
+
+
+@pytest_asyncio.fixture(name="search_client", scope="module", loop_scope="module")
+async def fixture_search_client(session: aiohttp.ClientSession) -> DocMetadataClient:
+    """Client over all providers and processors except retraction data."""
+    return DocMetadataClient(
+        session,
+        clients=cast(
+            Collection[type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]],
+            [client for client in ALL_CLIENTS if client != RetractionDataPostProcessor],
+        ),
+    )
 
 
-@pytest.mark.vcr
-@pytest.mark.parametrize(
-    "paper_attributes",
-    [
-        {
-            "title": (
-                "High-throughput screening of human genetic variants by pooled prime"
-                " editing"
-            ),
-            "source": ["semantic_scholar", "crossref"],
-            "key": "herger2024highthroughputscreeningof",
-            "doi": "10.1101/2024.04.01.587366",
-            "doc_id": "8e7669b50f31c52b",
-            "journal": "bioRxiv",
-            "authors": [
-                "Michael Herger",
-                "Christina M. Kajba",
-                "Megan Buckley",
-                "Ana Cunha",
-                "Molly Strom",
-                "Gregory M. Findlay",
-            ],
-            "formatted_citation": (
-                "Michael Herger, Christina M. Kajba, Megan Buckley, Ana Cunha, Molly"
-                " Strom, and Gregory M. Findlay. High-throughput screening of human"
-                " genetic variants by pooled prime editing. bioRxiv, Apr 2024. URL:"
-                " https://doi.org/10.1101/2024.04.01.587366,"
-                " doi:10.1101/2024.04.01.587366. This article has 1 citations."
-            ),
-            "is_oa": True,
-        },
-        {
-            "title": (
-                "An essential role of active site arginine residue in iodide binding"
-                " and histidine residue in electron transfer for iodide oxidation by"
-                " horseradish peroxidase"
-            ),
-            "source": ["semantic_scholar", "crossref"],
-            "key": "adak2001anessentialrole",
-            "doi": "10.1023/a:1007154515475",
-            "doc_id": "3012c6676b658a27",
-            "journal": "Molecular and Cellular Biochemistry",
-            "authors": [
-                "Subrata Adak",
-                "Debashis Bandyopadhyay",
-                "Uday Bandyopadhyay",
-                "Ranajit K. Banerjee",
-            ],
-            "formatted_citation": (
-                "Subrata Adak, Debashis Bandyopadhyay, Uday Bandyopadhyay, and Ranajit"
-                " K. Banerjee. An essential role of active site arginine residue in"
-                " iodide binding and histidine residue in electron transfer for iodide"
-                " oxidation by horseradish peroxidase. Molecular and Cellular"
-                " Biochemistry, 218:1-11, Feb 2001. URL:"
-                " https://doi.org/10.1023/a:1007154515475, doi:10.1023/a:1007154515475."
-                " This article has 7 citations and is from a peer-reviewed journal."
-            ),
-            "is_oa": False,
-        },
-        {
-            "title": "Convalescent-anti-sars-cov-2-plasma/immune-globulin",
-            "source": ["semantic_scholar", "crossref"],
-            "key": "unknownauthors2023convalescentantisarscov2plasmaimmuneglobulin",
-            "doi": "10.1007/s40278-023-41815-2",
-            "doc_id": "c2a60b772778732c",
-            "journal": "Reactions Weekly",
-            "authors": [],
-            "formatted_citation": (
-                "Unknown author(s)."
-                " Convalescent-anti-sars-cov-2-plasma/immune-globulin. Reactions"
-                " Weekly, 1962:145-145, Jun 2023. URL:"
-                " https://doi.org/10.1007/s40278-023-41815-2,"
-                " doi:10.1007/s40278-023-41815-2. This article has 0 citations and is"
-                " from a peer-reviewed journal."
-            ),
-            "is_oa": False,
-        },
-    ],
-)
-@pytest.mark.asyncio
-async def test_doi_search(paper_attributes: dict[str, str]) -> None:
-    async with aiohttp.ClientSession() as session:
-        client_list = [
-            client for client in ALL_CLIENTS if client != RetractionDataPostProcessor
-        ]
-        client = DocMetadataClient(
-            session,
-            clients=cast(
-                Collection[
-                    type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
-                ],
-                client_list,
-            ),
-        )
-        details = await client.query(doi=paper_attributes["doi"])
-        assert set(details.other["client_source"]) == set(  # type: ignore[union-attr]
-            paper_attributes["source"]
-        ), "Should have the correct source"
-        for key, value in paper_attributes.items():
-            if key not in {"is_oa", "source"}:
-                assert getattr(details, key) == value, f"Should have the correct {key}"
-            elif key == "is_oa":
-                assert (
-                    details.other.get("is_oa") == value  # type: ignore[union-attr]
-                ), "Open access data should match"
+@pytest_asyncio.fixture(name="s2_client", scope="module", loop_scope="module")
+async def fixture_s2_client(session: aiohttp.ClientSession) -> DocMetadataClient:
+    return DocMetadataClient(session, clients=[SemanticScholarProvider])
 
 
-@pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_bulk_doi_search() -> None:
-    dois = [
-        "10.1063/1.4938384",
-        "10.48550/arxiv.2312.07559",
-        "10.1038/s42256-024-00832-8",
-        "10.1101/2024.04.01.587366",
-        "10.1023/a:1007154515475",
-        "10.1007/s40278-023-41815-2",
-    ]
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.bulk_query([{"doi": doi} for doi in dois])
-        assert len(details) == 6, "Should return 6 results"
-        assert all(d for d in details), "All results should be non-None"
+@pytest_asyncio.fixture(name="crossref_client", scope="module", loop_scope="module")
+async def fixture_crossref_client(session: aiohttp.ClientSession) -> DocMetadataClient:
+    return DocMetadataClient(session, clients=[CrossrefProvider])
 
 
-@pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_bulk_title_search() -> None:
-    titles = [
-        (
-            "Effect of native oxide layers on copper thin-film tensile properties: A"
-            " reactive molecular dynamics study"
+@pytest_asyncio.fixture(name="crossref_jq_client", scope="module", loop_scope="module")
+async def fixture_crossref_jq_client(
+    session: aiohttp.ClientSession,
+) -> DocMetadataClient:
+    return DocMetadataClient(
+        session,
+        clients=cast(
+            Collection[type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]],
+            [CrossrefProvider, JournalQualityPostProcessor],
         ),
-        "PaperQA: Retrieval-Augmented Generative Agent for Scientific Research",
-        "Augmenting large language models with chemistry tools",
-        "High-throughput screening of human genetic variants by pooled prime editing",
-        (
-            "An essential role of active site arginine residue in iodide binding and"
-            " histidine residue in electron transfer for iodide oxidation by"
-            " horseradish peroxidase"
+    )
+
+
+# frozensets so the expected sources are built once at import and compared
+# against without per-assertion set construction on the expected side
+CROSSREF_SOURCE = frozenset({"crossref"})
+S2_SOURCE = frozenset({"semantic_scholar"})
+S2_AND_CROSSREF_SOURCES = S2_SOURCE | CROSSREF_SOURCE
+
+TITLE_SEARCH_PAPERS: list[dict[str, Any]] = [
+    {
+        "title": (
+            "Effect of native oxide layers on copper thin-film "
+            "tensile properties: A reactive molecular dynamics study"
         ),
-        "Convalescent-anti-sars-cov-2-plasma/immune-globulin",
-    ]
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.bulk_query([{"title": title} for title in titles])
-        assert len(details) == 6, "Should return 6 results"
-        assert all(d for d in details), "All results should be non-None"
+        "source": S2_AND_CROSSREF_SOURCES,
+        "key": "skarlinski2015effectofnative",
+        "doi": "10.1063/1.4938384",
+        "doc_id": "c217ec9289696c3c",
+        "journal": "Journal of Applied Physics",
+        "authors": ["Michael D. Skarlinski", "David J. Quesnel"],
+        "formatted_citation": (
+            "Michael D. Skarlinski and David J. Quesnel. Effect of native oxide"
+            " layers on copper thin-film tensile properties: a reactive molecular"
+            " dynamics study. Journal of Applied Physics, 118:235306, Dec 2015."
+            " URL: https://doi.org/10.1063/1.4938384, doi:10.1063/1.4938384. This"
+            " article has 8 citations and is from a peer-reviewed journal."
+        ),
+        "is_oa": False,
+    },
+    {
+        "title": (
+            "PaperQA: Retrieval-Augmented Generative Agent for Scientific Research"
+        ),
+        "source": S2_SOURCE,
+        "key": "lala2023paperqaretrievalaugmentedgenerative",
+        "doi": "10.48550/arxiv.2312.07559",
+        "doc_id": "bb985e0e3265d678",
+        "journal": "ArXiv",
+        "authors": [
+            "Jakub L'ala",
+            "Odhran O'Donoghue",
+            "Aleksandar Shtedritski",
+            "Sam Cox",
+            "Samuel G. Rodriques",
+            "Andrew D. White",
+        ],
+        "formatted_citation": (
+            "Jakub L'ala, Odhran O'Donoghue, Aleksandar Shtedritski, Sam Cox,"
+            " Samuel G. Rodriques, and Andrew D. White. Paperqa:"
+            " retrieval-augmented generative agent for scientific research. ArXiv,"
+            " Dec 2023. URL: https://doi.org/10.48550/arxiv.2312.07559,"
+            " doi:10.48550/arxiv.2312.07559. This article has 28 citations."
+        ),
+        "is_oa": None,
+    },
+    {
+        "title": "Augmenting large language models with chemistry tools",
+        "source": S2_AND_CROSSREF_SOURCES,
+        "key": "bran2024augmentinglargelanguage",
+        "doi": "10.1038/s42256-024-00832-8",
+        "doc_id": "0f650d59b0a2ba5a",
+        "journal": "Nature Machine Intelligence",
+        "authors": [
+            "Andres M. Bran",
+            "Sam Cox",
+            "Oliver Schilter",
+            "Carlo Baldassari",
+            "Andrew D. White",
+            "Philippe Schwaller",
+        ],
+        "formatted_citation": (
+            "Andres M. Bran, Sam Cox, Oliver Schilter, Carlo Baldassari, Andrew D."
+            " White, and Philippe Schwaller. Augmenting large language models with"
+            " chemistry tools. Nature Machine Intelligence, 6:525-535, May 2024."
+            " URL: https://doi.org/10.1038/s42256-024-00832-8,"
+            " doi:10.1038/s42256-024-00832-8. This article has 201 citations and is"
+            " from a domain leading peer-reviewed journal."
+        ),
+        "is_oa": True,
+    },
+]
+
+
+def assert_paper_attributes(details: Any, paper_attributes: dict[str, Any]) -> None:
+    assert (
+        frozenset(details.other["client_source"]) == paper_attributes["source"]
+    ), "Should have the correct source"
+    for key, value in paper_attributes.items():
+        if key not in {"is_oa", "source"}:
+            assert getattr(details, key) == value, f"Should have the correct {key}"
+        elif key == "is_oa":
+            assert details.other.get("is_oa") == value, "Open access data should match"
 
 
 @pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_bad_titles() -> None:
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.query(title="askldjrq3rjaw938h")
-        assert not details, "Should return None for bad title"
-        details = await client.query(
-            title=(
-                "Effect of native oxide layers on copper thin-film tensile properties:"
-                " A study"
-            )
-        )
-        assert details, "Should find a similar title"
+@pytest.mark.asyncio(loop_scope="module")
+async def test_title_search(search_client: DocMetadataClient) -> None:
+    all_details = await asyncio.gather(
+        *(search_client.query(title=paper["title"]) for paper in TITLE_SEARCH_PAPERS)
+    )
+    for paper_attributes, details in zip(TITLE_SEARCH_PAPERS, all_details, strict=True):
+        assert_paper_attributes(details, paper_attributes)
+
+
+DOI_SEARCH_PAPERS: list[dict[str, Any]] = [
+    {
+        "title": (
+            "High-throughput screening of human genetic variants by pooled prime"
+            " editing"
+        ),
+        "source": S2_AND_CROSSREF_SOURCES,
+        "key": "herger2024highthroughputscreeningof",
+        "doi": "10.1101/2024.04.01.587366",
+        "doc_id": "8e7669b50f31c52b",
+        "journal": "bioRxiv",
+        "authors": [
+            "Michael Herger",
+            "Christina M. Kajba",
+            "Megan Buckley",
+            "Ana Cunha",
+            "Molly Strom",
+            "Gregory M. Findlay",
+        ],
+        "formatted_citation": (
+            "Michael Herger, Christina M. Kajba, Megan Buckley, Ana Cunha, Molly"
+            " Strom, and Gregory M. Findlay. High-throughput screening of human"
+            " genetic variants by pooled prime editing. bioRxiv, Apr 2024. URL:"
+            " https://doi.org/10.1101/2024.04.01.587366,"
+            " doi:10.1101/2024.04.01.587366. This article has 1 citations."
+        ),
+        "is_oa": True,
+    },
+    {
+        "title": (
+            "An essential role of active site arginine residue in iodide binding"
+            " and histidine residue in electron transfer for iodide oxidation by"
+            " horseradish peroxidase"
+        ),
+        "source": S2_AND_CROSSREF_SOURCES,
+        "key": "adak2001anessentialrole",
+        "doi": "10.1023/a:1007154515475",
+        "doc_id": "3012c6676b658a27",
+        "journal": "Molecular and Cellular Biochemistry",
+        "authors": [
+            "Subrata Adak",
+            "Debashis Bandyopadhyay",
+            "Uday Bandyopadhyay",
+            "Ranajit K. Banerjee",
+        ],
+        "formatted_citation": (
+            "Subrata Adak, Debashis Bandyopadhyay, Uday Bandyopadhyay, and Ranajit"
+            " K. Banerjee. An essential role of active site arginine residue in"
+            " iodide binding and histidine residue in electron transfer for iodide"
+            " oxidation by horseradish peroxidase. Molecular and Cellular"
+            " Biochemistry, 218:1-11, Feb 2001. URL:"
+            " https://doi.org/10.1023/a:1007154515475, doi:10.1023/a:1007154515475."
+            " This article has 7 citations and is from a peer-reviewed journal."
+        ),
+        "is_oa": False,
+    },
+    {
+        "title": "Convalescent-anti-sars-cov-2-plasma/immune-globulin",
+        "source": S2_AND_CROSSREF_SOURCES,
+        "key": "unknownauthors2023convalescentantisarscov2plasmaimmuneglobulin",
+        "doi": "10.1007/s40278-023-41815-2",
+        "doc_id": "c2a60b772778732c",
+        "journal": "Reactions Weekly",
+        "authors": [],
+        "formatted_citation": (
+            "Unknown author(s)."
+            " Convalescent-anti-sars-cov-2-plasma/immune-globulin. Reactions"
+            " Weekly, 1962:145-145, Jun 2023. URL:"
+            " https://doi.org/10.1007/s40278-023-41815-2,"
+            " doi:10.1007/s40278-023-41815-2. This article has 0 citations and is"
+            " from a peer-reviewed journal."
+        ),
+        "is_oa": False,
+    },
+]
 
 
 @pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_bad_dois() -> None:
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.query(title="abs12032jsdafn")
-        assert not details, "Should return None for bad doi"
+@pytest.mark.asyncio(loop_scope="module")
+async def test_doi_search(search_client: DocMetadataClient) -> None:
+    all_details = await asyncio.gather(
+        *(search_client.query(doi=paper["doi"]) for paper in DOI_SEARCH_PAPERS)
+    )
+    for paper_attributes, details in zip(DOI_SEARCH_PAPERS, all_details, strict=True):
+        assert_paper_attributes(details, paper_attributes)
 
 
 @pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_minimal_fields_filtering() -> None:
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.query(
-            title="Augmenting large language models with chemistry tools",
-            fields=["title", "doi"],
-        )
-        assert not details.journal, "Journal should not be populated"  # type: ignore[union-attr]
-        assert not details.year, "Year should not be populated"  # type: ignore[union-attr]
-        assert not details.authors, "Authors should not be populated"  # type: ignore[union-attr]
-        assert details.citation == (  # type: ignore[union-attr]
-            "Unknown author(s). Augmenting large language models with chemistry tools."
-            " Unknown journal, Unknown year. URL:"
-            " https://doi.org/10.1038/s42256-024-00832-8,"
-            " doi:10.1038/s42256-024-00832-8."
-        ), "Citation should be populated"
-        assert set(details.other["client_source"]) == {  # type: ignore[union-attr]
-            "semantic_scholar",
-            "crossref",
-        }, "Should be from two sources"
-        assert not details.source_quality, "No source quality data should exist"  # type: ignore[union-attr]
+@pytest.mark.asyncio(loop_scope="module")
+async def test_bulk_search(default_client: DocMetadataClient) -> None:
+    dois = [paper["doi"] for paper in (*TITLE_SEARCH_PAPERS, *DOI_SEARCH_PAPERS)]
+    titles = [paper["title"] for paper in (*TITLE_SEARCH_PAPERS, *DOI_SEARCH_PAPERS)]
+    doi_details, title_details = await asyncio.gather(
+        default_client.bulk_query([{"doi": doi} for doi in dois]),
+        default_client.bulk_query([{"title": title} for title in titles]),
+    )
+    assert len(doi_details) == 6, "Should return 6 results"
+    assert all(d for d in doi_details), "All results should be non-None"
+    assert len(title_details) == 6, "Should return 6 results"
+    assert all(d for d in title_details), "All results should be non-None"
 
 
 @pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_s2_only_fields_filtering() -> None:
-    async with aiohttp.ClientSession() as session:
-        # now get with authors just from one source
-        s2_client = DocMetadataClient(session, clients=[SemanticScholarProvider])
-        s2_details = await s2_client.query(
-            title="Augmenting large language models with chemistry tools",
-            fields=["title", "doi", "authors"],
+@pytest.mark.asyncio(loop_scope="module")
+async def test_bad_titles(default_client: DocMetadataClient) -> None:
+    details = await default_client.query(title="askldjrq3rjaw938h")
+    assert not details, "Should return None for bad title"
+    details = await default_client.query(
+        title=(
+            "Effect of native oxide layers on copper thin-film tensile properties:"
+            " A study"
         )
-        assert s2_details.authors, "Authors should be populated"  # type: ignore[union-attr]
-        assert set(s2_details.other["client_source"]) == {"semantic_scholar"}  # type: ignore[union-attr]
-        assert s2_details.citation == (  # type: ignore[union-attr]
-            "Andrés M Bran, Sam Cox, Oliver Schilter, Carlo Baldassari, Andrew D."
-            " White, and P. Schwaller. Augmenting large language models with chemistry"
-            " tools. Unknown journal, Unknown year. URL:"
-            " https://doi.org/10.1038/s42256-024-00832-8,"
-            " doi:10.1038/s42256-024-00832-8."
-        ), "Citation should be populated"
-        assert not s2_details.source_quality, "No source quality data should exist"  # type: ignore[union-attr]
+    )
+    assert details, "Should find a similar title"
 
 
 @pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_crossref_journalquality_fields_filtering() -> None:
-    async with aiohttp.ClientSession() as session:
-        crossref_client = DocMetadataClient(
-            session,
-            clients=cast(
-                Collection[
-                    type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
-                ],
-                [CrossrefProvider, JournalQualityPostProcessor],
-            ),
-        )
-        crossref_details = await crossref_client.query(
-            title="Augmenting large language models with chemistry tools",
-            fields=["title", "doi", "authors", "journal"],
-        )
-        assert crossref_details, "Failed to query crossref"
-        assert set(crossref_details.other["client_source"]) == {
-            "crossref"
-        }, "Should be from only crossref"
-        assert crossref_details.source_quality == 2, "Should have source quality data"
-        assert (
-            crossref_details.citation
-            == "Andres M. Bran, Sam Cox, Oliver Schilter, Carlo Baldassari, Andrew D."
-            " White, and Philippe Schwaller. Augmenting large language models with"
-            " chemistry tools. Nature Machine Intelligence, Unknown year. URL:"
-            " https://doi.org/10.1038/s42256-024-00832-8,"
-            " doi:10.1038/s42256-024-00832-8."
-        ), "Citation should be populated"
+@pytest.mark.asyncio(loop_scope="module")
+async def test_bad_dois(default_client: DocMetadataClient) -> None:
+    details = await default_client.query(title="abs12032jsdafn")
+    assert not details, "Should return None for bad doi"
 
-    async with aiohttp.ClientSession() as session:
-        crossref_client = DocMetadataClient(
-            session,
-            clients=cast(
-                Collection[
-                    type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
-                ],
-                [CrossrefProvider, JournalQualityPostProcessor],
-            ),
-        )
-        nejm_crossref_details = await crossref_client.query(
-            title=(
-                "Beta-Blocker Interruption or Continuation after Myocardial Infarction"  # codespell:ignore
-            ),
-            fields=["title", "doi", "authors", "journal"],
-        )
 
-        assert nejm_crossref_details.source_quality == 3, "Should have source quality data"  # type: ignore[union-attr]
+@pytest.mark.vcr
+@pytest.mark.asyncio(loop_scope="module")
+async def test_minimal_fields_filtering(default_client: DocMetadataClient) -> None:
+    details = await default_client.query(
+        title="Augmenting large language models with chemistry tools",
+        fields=["title", "doi"],
+    )
+    assert not details.journal, "Journal should not be populated"  # type: ignore[union-attr]
+    assert not details.year, "Year should not be populated"  # type: ignore[union-attr]
+    assert not details.authors, "Authors should not be populated"  # type: ignore[union-attr]
+    assert details.citation == (  # type: ignore[union-attr]
+        "Unknown author(s). Augmenting large language models with chemistry tools."
+        " Unknown journal, Unknown year. URL:"
+        " https://doi.org/10.1038/s42256-024-00832-8,"
+        " doi:10.1038/s42256-024-00832-8."
+    ), "Citation should be populated"
+    assert (
+        frozenset(details.other["client_source"])  # type: ignore[union-attr]
+        == S2_AND_CROSSREF_SOURCES
+    ), "Should be from two sources"
+    assert not details.source_quality, "No source quality data should exist"  # type: ignore[union-attr]
 
 
 @pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_author_matching() -> None:
-    async with aiohttp.ClientSession() as session:
-        crossref_client = DocMetadataClient(session, clients=[CrossrefProvider])
-        s2_client = DocMetadataClient(session, clients=[SemanticScholarProvider])
-        crossref_details_bad_author = await crossref_client.query(
-            title="Augmenting large language models with chemistry tools",
-            authors=["Jack NoScience"],
-            fields=["title", "doi", "authors"],
-        )
+@pytest.mark.asyncio(loop_scope="module")
+async def test_s2_only_fields_filtering(s2_client: DocMetadataClient) -> None:
+    # now get with authors just from one source
+    s2_details = await s2_client.query(
+        title="Augmenting large language models with chemistry tools",
+        fields=["title", "doi", "authors"],
+    )
+    assert s2_details.authors, "Authors should be populated"  # type: ignore[union-attr]
+    assert frozenset(s2_details.other["client_source"]) == S2_SOURCE  # type: ignore[union-attr]
+    assert s2_details.citation == (  # type: ignore[union-attr]
+        "Andrés M Bran, Sam Cox, Oliver Schilter, Carlo Baldassari, Andrew D."
+        " White, and P. Schwaller. Augmenting large language models with chemistry"
+        " tools. Unknown journal, Unknown year. URL:"
+        " https://doi.org/10.1038/s42256-024-00832-8,"
+        " doi:10.1038/s42256-024-00832-8."
+    ), "Citation should be populated"
+    assert not s2_details.source_quality, "No source quality data should exist"  # type: ignore[union-attr]
 
-        s2_details_bad_author = await s2_client.query(
-            title="Augmenting large language models with chemistry tools",
-            authors=["Jack NoScience"],
-            fields=["title", "doi", "authors"],
-        )
 
-        s2_details_w_author = await s2_client.query(
-            title="Augmenting large language models with chemistry tools",
-            authors=["Andres M. Bran", "Sam Cox"],
-            fields=["title", "doi", "authors"],
-        )
+@pytest.mark.vcr
+@pytest.mark.asyncio(loop_scope="module")
+async def test_crossref_journalquality_fields_filtering(
+    crossref_jq_client: DocMetadataClient,
+) -> None:
+    crossref_details = await crossref_jq_client.query(
+        title="Augmenting large language models with chemistry tools",
+        fields=["title", "doi", "authors", "journal"],
+    )
+    assert crossref_details, "Failed to query crossref"
+    assert (
+        frozenset(crossref_details.other["client_source"]) == CROSSREF_SOURCE
+    ), "Should be from only crossref"
+    assert crossref_details.source_quality == 2, "Should have source quality data"
+    assert (
+        crossref_details.citation
+        == "Andres M. Bran, Sam Cox, Oliver Schilter, Carlo Baldassari, Andrew D."
+        " White, and Philippe Schwaller. Augmenting large language models with"
+        " chemistry tools. Nature Machine Intelligence, Unknown year. URL:"
+        " https://doi.org/10.1038/s42256-024-00832-8,"
+        " doi:10.1038/s42256-024-00832-8."
+    ), "Citation should be populated"
+
+    nejm_crossref_details = await crossref_jq_client.query(
+        title=(
+            "Beta-Blocker Interruption or Continuation after Myocardial Infarction"  # codespell:ignore
+        ),
+        fields=["title", "doi", "authors", "journal"],
+    )
 
-        assert not crossref_details_bad_author, "Should return None for bad author"
-        assert not s2_details_bad_author, "Should return None for bad author"
-        assert s2_details_w_author, "Should return results for good author"
+    assert nejm_crossref_details.source_quality == 3, "Should have source quality data"  # type: ignore[union-attr]
 
 
 @pytest.mark.vcr
-@pytest.mark.asyncio
-async def test_odd_client_requests() -> None:
-    # try querying using an authors match, but not requesting authors back
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.query(
-            title="Augmenting large language models with chemistry tools",
-            authors=["Andres M. Bran", "Sam Cox"],
-            fields=["title", "doi"],
+@pytest.mark.asyncio(loop_scope="module")
+async def test_author_matching(
+    crossref_client: DocMetadataClient, s2_client: DocMetadataClient
+) -> None:
+    crossref_details_bad_author, s2_details_bad_author, s2_details_w_author = (
+        await asyncio.gather(
+            crossref_client.query(
+                title="Augmenting large language models with chemistry tools",
+                authors=["Jack NoScience"],
+                fields=["title", "doi", "authors"],
+            ),
+            s2_client.query(
+                title="Augmenting large language models with chemistry tools",
+                authors=["Jack NoScience"],
+                fields=["title", "doi", "authors"],
+            ),
+            s2_client.query(
+                title="Augmenting large language models with chemistry tools",
+                authors=["Andres M. Bran", "Sam Cox"],
+                fields=["title", "doi", "authors"],
+            ),
         )
-        assert (
-            details.authors  # type: ignore[union-attr]
-        ), "Should return correct author results"
+    )
 
-    # try querying using a title, asking for no DOI back
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.query(
-            title="Augmenting large language models with chemistry tools",
-            fields=["title"],
-        )
-        assert (
-            details.doi  # type: ignore[union-attr]
-        ), "Should return a doi even though we don't ask for it"
+    assert not crossref_details_bad_author, "Should return None for bad author"
+    assert not s2_details_bad_author, "Should return None for bad author"
+    assert s2_details_w_author, "Should return results for good author"
 
-    # try querying using a title, asking for no title back
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.query(
-            title="Augmenting large language models with chemistry tools",
-            fields=["doi"],
-        )
-        assert (
-            details.title  # type: ignore[union-attr]
-        ), "Should return a title even though we don't ask for it"
 
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.query(
-            doi="10.1007/s40278-023-41815-2",
-            fields=["doi", "title", "gibberish-field", "no-field"],
+@pytest.mark.vcr
+@pytest.mark.asyncio(loop_scope="module")
+async def test_odd_client_requests(default_client: DocMetadataClient) -> None:
+    author_details, no_doi_details, no_title_details, bad_field_details = (
+        await asyncio.gather(
+            # query using an authors match, but not requesting authors back
+            default_client.query(
+                title="Augmenting large language models with chemistry tools",
+                authors=["Andres M. Bran", "Sam Cox"],
+                fields=["title", "doi"],
+            ),
+            # query using a title, asking for no DOI back
+            default_client.query(
+                title="Augmenting large language models with chemistry tools",
+                fields=["title"],
+            ),
+            # query using a title, asking for no title back
+            default_client.query(
+                title="Augmenting large language models with chemistry tools",
+                fields=["doi"],
+            ),
+            default_client.query(
+                doi="10.1007/s40278-023-41815-2",
+                fields=["doi", "title", "gibberish-field", "no-field"],
+            ),
         )
-        assert (
-            details.title  # type: ignore[union-attr]
-        ), "Should return title even though we asked for some bad fields"
-
-
-@pytest.mark.asyncio
+    )
+    assert (
+        author_details.authors  # type: ignore[union-attr]
+    ), "Should return correct author results"
+    assert (
+        no_doi_details.doi  # type: ignore[union-attr]
+    ), "Should return a doi even though we don't ask for it"
+    assert (
+        no_title_details.title  # type: ignore[union-attr]
+    ), "Should return a title even though we don't ask for it"
+    assert (
+        bad_field_details.title  # type: ignore[union-attr]
+    ), "Should return title even though we asked for some bad fields"
+
+
+@pytest.mark.asyncio(loop_scope="module")
 @patch.object(paperqa.clients.crossref, "CROSSREF_API_REQUEST_TIMEOUT", 0.05)
 @patch.object(
     paperqa.clients.semantic_scholar, "SEMANTIC_SCHOLAR_API_REQUEST_TIMEOUT", 0.05
 )
-async def test_ensure_robust_to_timeouts() -> None:
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(session)
-        details = await client.query(
-            doi="10.1007/s40278-023-41815-2",
-            fields=["doi", "title"],
-        )
+async def test_ensure_robust_to_timeouts(default_client: DocMetadataClient) -> None:
+    details = await default_client.query(
+        doi="10.1007/s40278-023-41815-2",
+        fields=["doi", "title"],
+    )
     assert details is None, "Should return None for timeout"
 
 
@@ -501,103 +478,282 @@ async def test_bad_init() -> None:
 
 @pytest.mark.vcr
 @pytest.mark.usefixtures("reset_log_levels")
-@pytest.mark.asyncio
-async def test_ensure_sequential_run(caplog) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_ensure_sequential_run(caplog, session: aiohttp.ClientSession) -> None:
     caplog.set_level(logging.DEBUG)
     # were using a DOI that is NOT in crossref, but running the crossref client first
     # we will ensure that both are run sequentially
 
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(
-            session=session,
-            clients=cast(
-                Sequence[
-                    Collection[
-                        type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
-                    ]
-                ],
-                [[CrossrefProvider], [SemanticScholarProvider]],
-            ),
-        )
-        details = await client.query(
-            doi="10.48550/arxiv.2312.07559",
-            fields=["doi", "title"],
-        )
-        assert details, "Should find the right DOI in the second client"
-        record_indices = {"crossref": -1, "semantic_scholar": -1}
-        for n, record in enumerate(caplog.records):
-            if "CrossrefProvider" in record.msg:
-                record_indices["crossref"] = n
-            if "SemanticScholarProvider" in record.msg:
-                record_indices["semantic_scholar"] = n
-        assert (
-            record_indices["crossref"] < record_indices["semantic_scholar"]
-        ), "Crossref should run first"
+    client = DocMetadataClient(
+        session=session,
+        clients=cast(
+            Sequence[
+                Collection[
+                    type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
+                ]
+            ],
+            [[CrossrefProvider], [SemanticScholarProvider]],
+        ),
+    )
+    details = await client.query(
+        doi="10.48550/arxiv.2312.07559",
+        fields=["doi", "title"],
+    )
+    assert details, "Should find the right DOI in the second client"
+    record_indices = {"crossref": -1, "semantic_scholar": -1}
+    for n, record in enumerate(caplog.records):
+        if "CrossrefProvider" in record.msg:
+            record_indices["crossref"] = n
+        if "SemanticScholarProvider" in record.msg:
+            record_indices["semantic_scholar"] = n
+    assert (
+        record_indices["crossref"] < record_indices["semantic_scholar"]
+    ), "Crossref should run first"
 
 
 @pytest.mark.vcr
 @pytest.mark.usefixtures("reset_log_levels")
-@pytest.mark.asyncio
-async def test_ensure_sequential_run_early_stop(caplog) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_ensure_sequential_run_early_stop(
+    caplog, session: aiohttp.ClientSession
+) -> None:
     caplog.set_level(logging.DEBUG)
     # now we should stop after hitting s2
-    async with aiohttp.ClientSession() as session:
-        client = DocMetadataClient(
-            session=session,
-            clients=cast(
-                Sequence[
-                    Collection[
-                        type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
-                    ]
-                ],
-                [[SemanticScholarProvider], [CrossrefProvider]],
-            ),
-        )
-        details = await client.query(
-            doi="10.48550/arxiv.2312.07559",
-            fields=["doi", "title"],
-        )
-        assert details, "Should find the right DOI in the second client"
-        record_indices = {"crossref": -1, "semantic_scholar": -1, "early_stop": -1}
-        for n, record in enumerate(caplog.records):
-            if "CrossrefProvider" in record.msg:
-                record_indices["crossref"] = n
-            if "SemanticScholarProvider" in record.msg:
-                record_indices["semantic_scholar"] = n
-            if "stopping early." in record.msg:
-                record_indices["early_stop"] = n
-        assert (
-            record_indices["crossref"] == -1
-        ), "Crossref should be index -1 i.e. not found"
-        assert (
-            record_indices["semantic_scholar"] != -1
-        ), "Semantic Scholar should be found"
-        assert record_indices["early_stop"] != -1, "We should stop early."
+    client = DocMetadataClient(
+        session=session,
+        clients=cast(
+            Sequence[
+                Collection[
+                    type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
+                ]
+            ],
+            [[SemanticScholarProvider], [CrossrefProvider]],
+        ),
+    )
+    details = await client.query(
+        doi="10.48550/arxiv.2312.07559",
+        fields=["doi", "title"],
+    )
+    assert details, "Should find the right DOI in the second client"
+    record_indices = {"crossref": -1, "semantic_scholar": -1, "early_stop": -1}
+    for n, record in enumerate(caplog.records):
+        if "CrossrefProvider" in record.msg:
+            record_indices["crossref"] = n
+        if "SemanticScholarProvider" in record.msg:
+            record_indices["semantic_scholar"] = n
+        if "stopping early." in record.msg:
+            record_indices["early_stop"] = n
+    assert (
+        record_indices["crossref"] == -1
+    ), "Crossref should be index -1 i.e. not found"
+    assert record_indices["semantic_scholar"] != -1, "Semantic Scholar should be found"
+    assert record_indices["early_stop"] != -1, "We should stop early."
 
 
 @pytest.mark.vcr
+@pytest.mark.asyncio(loop_scope="module")
+async def test_crossref_retraction_status(
+    stub_data_dir: Path, session: aiohttp.ClientSession
+) -> None:
+    retract_processor = RetractionDataPostProcessor(
+        f"{stub_data_dir}/stub_retractions.csv"
+    )
+    crossref_client = DocMetadataClient(
+        session,
+        clients=cast(
+            Collection[type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]],
+            [CrossrefProvider, retract_processor],
+        ),
+    )
+    crossref_details = await crossref_client.query(
+        title="The Dilemma and Countermeasures of Music Education under the Background of Big Data",
+        fields=["title", "doi", "authors", "journal"],
+    )
+    assert crossref_details
+    assert (
+        "**RETRACTED ARTICLE** Citation: Jiaye Han."
+        in crossref_details.formatted_citation
+    )
+    assert crossref_details.is_retracted is True, "Should be retracted"
+
+
+class StubCrossrefResponse:
+    """Minimal stand-in for an aiohttp response, for tests that skip the network."""
+
+    def __init__(
+        self,
+        *,
+        ok: bool = True,
+        status: int = 200,
+        text: str = "",
+        json_data: Any = None,
+    ) -> None:
+        self.ok = ok
+        self.status = status
+        self._text = text
+        self._json_data = json_data
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def text(self) -> str:
+        return self._text
+
+    async def json(self) -> Any:
+        return self._json_data
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise aiohttp.ClientResponseError(
+                request_info=None,  # type: ignore[arg-type]
+                history=(),
+                status=self.status,
+            )
+
+
+STUB_BIBTEX = (
+    "@article{Skarlinski_2015, title={Stub title}, author={Skarlinski, Michael D."
+    " and Quesnel, David J.}, year={2015}, journal={Stub Journal}}"
+)
+
+
 @pytest.mark.asyncio
-async def test_crossref_retraction_status(stub_data_dir: Path) -> None:
+async def test_doi_to_bibtex_returns_entry_and_key() -> None:
     async with aiohttp.ClientSession() as session:
-        retract_processor = RetractionDataPostProcessor(
-            f"{stub_data_dir}/stub_retractions.csv"
+        session.get = (  # type: ignore[method-assign]
+            lambda *_, **__: StubCrossrefResponse(text=STUB_BIBTEX)
         )
-        crossref_client = DocMetadataClient(
-            session,
-            clients=cast(
-                Collection[
-                    type[MetadataPostProcessor[Any]] | type[MetadataProvider[Any]]
-                ],
-                [CrossrefProvider, retract_processor],
-            ),
-        )
-        crossref_details = await crossref_client.query(
-            title="The Dilemma and Countermeasures of Music Education under the Background of Big Data",
-            fields=["title", "doi", "authors", "journal"],
+        bibtex, key = await crossref.doi_to_bibtex("10.0000/stub", session)
+        assert key == "skarlinski2015stubtitle", "Should build the key from the fields"
+        assert bibtex.startswith(f"@article{{{key},"), "Entry should carry the new key"
+
+        # an unresolvable DOI raises by default, or returns None when opted out
+        session.get = (  # type: ignore[method-assign]
+            lambda *_, **__: StubCrossrefResponse(ok=False, status=404)
         )
-        assert crossref_details
+        with pytest.raises(DOINotFoundError):
+            await crossref.doi_to_bibtex("10.0000/missing", session)
         assert (
-            "**RETRACTED ARTICLE** Citation: Jiaye Han."
-            in crossref_details.formatted_citation
+            await crossref.doi_to_bibtex(
+                "10.0000/missing", session, raise_on_missing=False
+            )
+            is None
         )
-        assert crossref_details.is_retracted is True, "Should be retracted"
+
+
+@pytest.mark.asyncio
+async def test_crossref_cache_round_trip(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("PQA_HOME", str(tmp_path))
+    monkeypatch.setenv("PAPERQA_CROSSREF_CACHE", "1")
+    monkeypatch.setattr(crossref, "_crossref_cache_conn", None)
+
+    key = crossref._crossref_cache_key(fn="test", doi="10.0000/stub")
+    assert await crossref._crossref_cache_get(key) is None, "Should miss before set"
+    await crossref._crossref_cache_set(key, STUB_BIBTEX)
+    assert await crossref._crossref_cache_get(key) == STUB_BIBTEX, "Should hit"
+
+    # entries older than the TTL are treated as misses and evicted
+    monkeypatch.setattr(crossref, "CROSSREF_CACHE_TTL_SECONDS", -1)
+    assert await crossref._crossref_cache_get(key) is None, "Should expire"
+    monkeypatch.setattr(crossref, "CROSSREF_CACHE_TTL_SECONDS", 60)
+    assert await crossref._crossref_cache_get(key) is None, "Expiry should evict"
+
+
+@pytest.mark.asyncio
+async def test_crossref_cache_disabled_without_env(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("PQA_HOME", str(tmp_path))
+    monkeypatch.delenv("PAPERQA_CROSSREF_CACHE", raising=False)
+    monkeypatch.setattr(crossref, "_crossref_cache_conn", None)
+
+    key = crossref._crossref_cache_key(fn="test", doi="10.0000/stub")
+    await crossref._crossref_cache_set(key, STUB_BIBTEX)
+    assert await crossref._crossref_cache_get(key) is None, "Opt-in only"
+    assert not (tmp_path / "caches").exists(), "No cache file without opt-in"
+
+
+@pytest.mark.asyncio
+async def test_doi_batcher_coalesces_concurrent_queries() -> None:
+    dois = ["10.0000/stub-1", "10.0000/stub-2"]
+    calls: list[dict[str, str]] = []
+
+    async def fake_parse(message, session, query_bibtex=True):  # noqa: ARG001
+        return message["DOI"]
+
+    async with aiohttp.ClientSession() as session:
+
+        def fake_get(url, *, params, **kwargs):  # noqa: ARG001
+            calls.append(params)
+            return StubCrossrefResponse(
+                json_data={
+                    "status": "ok",
+                    "message": {"items": [{"DOI": doi} for doi in dois]},
+                }
+            )
+
+        session.get = fake_get  # type: ignore[method-assign]
+        batcher = crossref._DOIBatcher()
+        with patch.object(crossref, "parse_crossref_to_doc_details", fake_parse):
+            results = await asyncio.gather(
+                *(batcher.query(DOIQuery(doi=doi, session=session)) for doi in dois)
+            )
+    assert results == dois, "Each query should resolve to its own DOI's record"
+    assert len(calls) == 1, "Concurrent queries should coalesce into one request"
+    assert calls[0]["filter"] == "doi:10.0000/stub-1,doi:10.0000/stub-2"
+
+
+@pytest.mark.asyncio
+async def test_doi_batcher_falls_back_per_doi() -> None:
+    async def fake_get_doc_details(doi, session, fields=None):  # noqa: ARG001
+        return doi
+
+    async with aiohttp.ClientSession() as session:
+
+        def fake_get(url, **kwargs):  # noqa: ARG001
+            raise aiohttp.ClientConnectionError("stub batch failure")
+
+        session.get = fake_get  # type: ignore[method-assign]
+        batcher = crossref._DOIBatcher()
+        with patch.object(
+            crossref, "get_doc_details_from_crossref", fake_get_doc_details
+        ):
+            results = await asyncio.gather(
+                batcher.query(DOIQuery(doi="10.0000/stub-1", session=session)),
+                batcher.query(DOIQuery(doi="10.0000/stub-2", session=session)),
+            )
+    assert results == ["10.0000/stub-1", "10.0000/stub-2"]
+
+
+@pytest.mark.asyncio
+async def test_doi_batcher_drains_queries_arriving_mid_flush() -> None:
+    """A query arriving while a flush is in flight must still be resolved."""
+    in_flight = asyncio.Event()
+    release = asyncio.Event()
+
+    async def fake_flush(batch) -> None:
+        in_flight.set()
+        await release.wait()
+        for query, future in batch:
+            if not future.done():
+                future.set_result(query.doi)
+
+    async with aiohttp.ClientSession() as session:
+        batcher = crossref._DOIBatcher()
+        with patch.object(crossref._DOIBatcher, "_flush", staticmethod(fake_flush)):
+            first = asyncio.create_task(
+                batcher.query(DOIQuery(doi="10.0000/stub-1", session=session))
+            )
+            await in_flight.wait()
+            second = asyncio.create_task(
+                batcher.query(DOIQuery(doi="10.0000/stub-2", session=session))
+            )
+            await asyncio.sleep(0)
+            release.set()
+            assert await asyncio.wait_for(first, timeout=5) == "10.0000/stub-1"
+            assert await asyncio.wait_for(second, timeout=5) == "10.0000/stub-2"